@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Dict, Union, Optional, Any
 from enum import Enum
 from datetime import time
@@ -59,7 +60,7 @@ class LegConfig:
     delta_target: Optional[float] = None
     strike_offset: int = 0
 
-@dataclass
+@dataclass(frozen=True)
 class TradeConfig:
     """
     Master configuration for a specific trade strategy
@@ -77,6 +78,10 @@ class TradeConfig:
         min_credit: Minimum credit required (for credit trades)
         active: Whether this trade is currently active
         description: Detailed description of the strategy
+        quantity: Number of spreads to trade (multiplies leg quantities)
+    
+    Configs are frozen, so the per-leg values used when logging and
+    recording a trade are derived from legs once and cached.
     """
     trade_name: str
     trade_type: TradeType
@@ -90,6 +95,46 @@ class TradeConfig:
     min_credit: Optional[float] = None
     active: bool = True
     description: str = ""
+    quantity: int = 1
+
+    @cached_property
+    def _legs_by_role(self) -> Dict[tuple, LegConfig]:
+        """Legs keyed by (leg_type, position)"""
+        return {(leg.leg_type, leg.position): leg for leg in self.legs}
+
+    def _leg_value(self, leg_type: str, position: int, attr: str) -> Any:
+        leg = self._legs_by_role.get((leg_type, position))
+        return getattr(leg, attr) if leg else None
+
+    @cached_property
+    def short_dte(self) -> Optional[int]:
+        return self._leg_value("PUT", -1, "dte")
+
+    @cached_property
+    def put_long_dte(self) -> Optional[int]:
+        return self._leg_value("PUT", 1, "dte")
+
+    @cached_property
+    def call_long_dte(self) -> Optional[int]:
+        return self._leg_value("CALL", 1, "dte")
+
+    @cached_property
+    def put_delta(self) -> Optional[float]:
+        return self._leg_value("PUT", -1, "delta_target")
+
+    @cached_property
+    def call_delta(self) -> Optional[float]:
+        return self._leg_value("CALL", -1, "delta_target")
+
+    @cached_property
+    def put_width(self) -> Optional[int]:
+        offset = self._leg_value("PUT", 1, "strike_offset")
+        return abs(offset) if offset is not None else None
+
+    @cached_property
+    def call_width(self) -> Optional[int]:
+        offset = self._leg_value("CALL", 1, "strike_offset")
+        return abs(offset) if offset is not None else None
 
 # Double Calendar Configurations
 DC_CONFIG = TradeConfig(
@@ -54,6 +54,9 @@ class IBWrapper(EWrapper):
         self._option_chain_event = Event()
         self._next_req_id = 2000
         self.client = None
+        self.positions = {}  # conId -> OptionPosition, from position() callbacks
+        self.next_order_id = None  # From nextValidId; use get_next_order_id()
+        self._order_id_lock = Lock()
         print("IBWrapper initialized")
 
     def set_client(self, client):
@@ -70,6 +73,29 @@ class IBWrapper(EWrapper):
                 self.es_price = price
                 self._notify_callbacks({"symbol": "ES", "price": price})
 
+    def nextValidId(self, orderId: int):
+        """First usable order id, sent on connect"""
+        with self._order_id_lock:
+            self.next_order_id = orderId
+
+    def get_next_order_id(self):
+        """Allocate an order id, or None before nextValidId arrives"""
+        with self._order_id_lock:
+            if self.next_order_id is None:
+                return None
+            order_id = self.next_order_id
+            self.next_order_id += 1
+            return order_id
+
+    def position(self, account: str, contract: Contract, position, avgCost: float):
+        """Track open positions reported after reqPositions"""
+        if position:
+            self.positions[contract.conId] = OptionPosition(
+                contract=contract, position=int(position), average_cost=avgCost
+            )
+        else:
+            self.positions.pop(contract.conId, None)
+
     def error(self, reqId: int, errorCode: int, errorString: str, advancedOrderRejectJson: str = ""):
         """Handle TWS errors"""
         print(f"TWS Error - ID: {reqId}, Code: {errorCode}, Message: {errorString}")
@@ -135,6 +161,7 @@ class ConnectionManager:
                 print("Connected to TWS")
                 self._running = True
                 self.request_market_data()
+                self.client.reqPositions()  # Keeps wrapper.positions current
                 return True
             else:
                 print("Failed to connect")
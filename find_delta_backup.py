@@ -1,18 +1,29 @@
 from connection.tws_connector import TWSConnector, OptionPosition
 import time
 from datetime import datetime, timedelta
-import pytz
 from trading.scheduler import TradeScheduler
 from config.trade_config import TradeConfig, DC_CONFIG, DC_CONFIG_2, DC_CONFIG_3, DC_CONFIG_4, DC_CONFIG_5, DC_CONFIG_6
 from trading.database import TradeDatabase
+from utils.date_utils import ET_TIMEZONE
 import sys
 import threading
 from typing import Optional
 import queue
+from functools import partial
+from collections import OrderedDict
+
+# A winning strike priced within this many seconds isn't re-quoted
+PRICE_REUSE_SECONDS = 5
+
+# Strike-search premiums are reused within the same 10-second bucket
+SEARCH_PRICE_BUCKET = 10
+SEARCH_PRICE_CACHE_SIZE = 256
+# LRU of (expiry, right, strike) -> (bucket, premium, fetched at)
+_search_prices = OrderedDict()
 
 def is_market_hours():
     """Check if we can get quotes (20:15 - 16:00 ET, Mon-Fri)"""
-    et_time = datetime.now(pytz.timezone('US/Eastern'))
+    et_time = datetime.now(ET_TIMEZONE)
     
     # Check if it's a weekday
     if et_time.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
@@ -28,7 +39,7 @@ def is_market_hours():
 
 def get_expiry_from_dte(dte: int) -> str:
     """Calculate the expiry date string from DTE (Days To Expiry)"""
-    et_time = datetime.now(pytz.timezone('US/Eastern'))
+    et_time = datetime.now(ET_TIMEZONE)
     
     # If after 4:15 PM ET, start counting from tomorrow
     if et_time.hour > 16 or (et_time.hour == 16 and et_time.minute >= 15):
@@ -43,6 +54,47 @@ def get_expiry_from_dte(dte: int) -> str:
         
     return expiry_date.strftime('%Y%m%d')
 
+def wait_for_bid_ask(tws: TWSConnector, req_id: int, timeout: float = 2.0):
+    """Block until both bid and ask arrive for req_id (or timeout); returns (bid, ask)"""
+    bid = ask = None
+    deadline = time.time() + timeout
+    while bid is None or ask is None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            # Sleep on the queue for the whole remaining time - put() wakes us
+            # as soon as a tick lands, so there's no poll interval to wait out
+            msg = tws.data_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if msg[0] == 'price' and msg[1] == req_id:
+            if msg[2] == 1:  # Bid
+                bid = msg[3]
+            elif msg[2] == 2:  # Ask
+                ask = msg[3]
+    return bid, ask
+
+def get_search_price(tws: TWSConnector, option: OptionPosition, expiry: str, right: str) -> tuple:
+    """(premium, time it was fetched) for a strike probe, reused if the same strike was priced in this bucket"""
+    fetched_at = time.time()
+    bucket = int(fetched_at) // SEARCH_PRICE_BUCKET
+    key = (expiry, right, option.contract.strike)
+    cached = _search_prices.get(key)
+    if cached and cached[0] == bucket:
+        _search_prices.move_to_end(key)
+        return cached[1], cached[2]
+    price = tws.get_option_price(option.contract)
+    _search_prices[key] = (bucket, price, fetched_at)
+    _search_prices.move_to_end(key)
+    if len(_search_prices) > SEARCH_PRICE_CACHE_SIZE:
+        _search_prices.popitem(last=False)  # Least recently used
+    return price, fetched_at
+
+def flush_price_cache():
+    """Drop cached search premiums so order pricing always starts fresh"""
+    _search_prices.clear()
+
 def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial_strike: float, target_delta: float = 0.15) -> Optional[OptionPosition]:
     """Find an option with a target delta using binary search"""
     print(f"\nLooking for {right} option with target delta/premium: {target_delta}")
@@ -57,6 +109,9 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
     search_type = "premium" if searching_by_premium else "delta"
     print(f"Searching by {search_type}")
     
+    # Calls sit above the money, puts below: +1 for calls, -1 for puts
+    sign = 1 if right == "C" else -1
+    
     # For puts searching by premium, adjust initial strike based on DTE
     if searching_by_premium:
         current_spx = tws.spx_price  # Get current SPX price
@@ -65,21 +120,13 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
         if expiry == get_expiry_from_dte(0):  # If it's 0DTE
             # For 0DTE puts targeting $1.60, start slightly OTM
             # For 0DTE calls targeting $1.30, start slightly OTM
-            if right == "P":
-                # Start about 20-30 points BELOW current price for puts
-                initial_strike = round((current_spx - 25) / 5) * 5
-                strike_increment = 5  # Use 5-point increments
-            else:  # Calls
-                # Start about 20-30 points ABOVE current price for calls
-                initial_strike = round((current_spx + 25) / 5) * 5
-                strike_increment = 5  # Use 5-point increments
+            # Start about 20-30 points BELOW current price for puts, ABOVE for calls
+            initial_strike = round((current_spx + sign * 25) / 5) * 5
+            strike_increment = 5  # Use 5-point increments
             print(f"0DTE option - starting at strike {initial_strike} ({'+' if initial_strike > current_spx else '-'}{abs(initial_strike - current_spx)} points from current price)")
         else:
             # For longer dated options, can start further OTM
-            if right == "P":
-                initial_strike = round((current_spx - 50) / 5) * 5
-            else:
-                initial_strike = round((current_spx + 50) / 5) * 5
+            initial_strike = round((current_spx + sign * 50) / 5) * 5
             strike_increment = 5
     else:
         strike_increment = 5  # Standard increment for delta-based search
@@ -99,19 +146,7 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
         tws.reqMktData(req_id, options[0].contract, "100,101", False, False, [])  # Request bid/ask
         
         # Wait for bid/ask data
-        bid = ask = None
-        timeout = time.time() + 2
-        while time.time() < timeout and (bid is None or ask is None):
-            try:
-                msg = tws.data_queue.get(timeout=0.1)
-                if msg[0] == 'price' and msg[1] == req_id:
-                    if msg[2] == 1:  # Bid
-                        bid = msg[3]
-                    elif msg[2] == 2:  # Ask
-                        ask = msg[3]
-            except queue.Empty:
-                continue
-        
+        bid, ask = wait_for_bid_ask(tws, req_id)
         tws.cancelMktData(req_id)
         
         if bid is not None and ask is not None:
@@ -127,6 +162,8 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
     # Initialize search variables
     best_option = options[0]
     best_diff = abs(current_value - target_delta)
+    best_value = current_value  # Last measured premium/delta of best_option
+    best_priced_at = time.time()
     
     # Determine search direction
     if searching_by_premium:
@@ -136,7 +173,7 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
         # For delta: 
         # For puts: if delta is too low, move UP to get higher delta
         # For calls: if delta is too high, move UP to get lower delta
-        search_up = (right == "P" and current_value < target_delta) or (right == "C" and current_value > target_delta)
+        search_up = sign * (current_value - target_delta) > 0
     
     print(f"\nSearch direction: {'UP' if search_up else 'DOWN'} from strike {best_option.contract.strike}")
     print(f"Current {search_type}: {current_value:.3f}, Target: {target_delta:.3f}")
@@ -161,27 +198,31 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
             
         # Get new option's delta or premium
         if searching_by_premium:
-            current_value = tws.get_option_price(options[0].contract)
+            # A cached premium keeps its original fetch time, so the reuse
+            # check below never treats an old quote as fresh
+            current_value, priced_at = get_search_price(tws, options[0], expiry, right)
             print(f"Strike {next_strike}: premium = {current_value:.2f} (target: {target_delta:.2f})")
         else:
             current_value = options[0].delta if options[0].delta is not None else 0
+            priced_at = time.time()
             print(f"Strike {next_strike}: delta = {current_value:.3f} (target: {target_delta:.3f})")
             
         # Check if this option is better
         current_diff = abs(current_value - target_delta)
-        previous_diff = abs(best_option.delta - target_delta) if not searching_by_premium else abs(best_option.market_price - target_delta)
-        print(f"Current difference: {current_diff:.3f}, Previous best: {previous_diff:.3f}")
+        print(f"Current difference: {current_diff:.3f}, Previous best: {best_diff:.3f}")
         
-        if current_diff < previous_diff:
+        if current_diff < best_diff:
             print(f"Found better option - updating best")
             best_diff = current_diff
             best_option = options[0]
+            best_value = current_value
+            best_priced_at = priced_at
             
             # If we're very close to target, stop searching
             if current_diff < 0.02:  # Within 0.02 of target
                 print(f"Within 0.02 of target - stopping search")
                 break
-        elif current_diff > previous_diff * 1.5:  # If getting significantly worse
+        elif current_diff > best_diff * 1.5:  # If getting significantly worse
             print(f"Getting significantly worse - stopping search")
             break
             
@@ -189,27 +230,21 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
         if not searching_by_premium:
             # For puts: if delta is still too low, keep moving UP
             # For calls: if delta is still too high, keep moving UP
-            search_up = (right == "P" and current_value < target_delta) or (right == "C" and current_value > target_delta)
+            search_up = sign * (current_value - target_delta) > 0
     
     if best_option:
-        if searching_by_premium:
+        if searching_by_premium and time.time() - best_priced_at <= PRICE_REUSE_SECONDS:
+            # The winner was just priced in the search - reuse that mid
+            print(f"\nFound {right} option:")
+            print(f"Strike: {best_option.contract.strike}")
+            print(f"Premium: {best_value:.2f} (target: {target_delta:.2f})")
+            best_option.market_price = best_value
+        elif searching_by_premium:
             # Get final bid/ask for display
             req_id = tws.get_next_req_id()
             tws.reqMktData(req_id, best_option.contract, "100,101", False, False, [])
             
-            bid = ask = None
-            timeout = time.time() + 2
-            while time.time() < timeout and (bid is None or ask is None):
-                try:
-                    msg = tws.data_queue.get(timeout=0.1)
-                    if msg[0] == 'price' and msg[1] == req_id:
-                        if msg[2] == 1:  # Bid
-                            bid = msg[3]
-                        elif msg[2] == 2:  # Ask
-                            ask = msg[3]
-                except queue.Empty:
-                    continue
-            
+            bid, ask = wait_for_bid_ask(tws, req_id)
             tws.cancelMktData(req_id)
             
             if bid is not None and ask is not None:
@@ -225,7 +260,7 @@ def find_target_delta_option(tws: TWSConnector, expiry: str, right: str, initial
             
         # Set up exit monitoring if this is a short option with premium > 1.0
         if searching_by_premium:
-            best_option.exit_price = best_option.contract.strike + (2 if right == "P" else -2)
+            best_option.exit_price = best_option.contract.strike - sign * 2
     
     return best_option
 
@@ -378,6 +413,7 @@ def execute_iron_condor(tws: TWSConnector = None):
             print(f"    Break-even Points: {put_option.contract.strike - total_credit:.0f} and {call_option.contract.strike + total_credit:.0f}")
             
             # Submit the order
+            flush_price_cache()
             order_id = tws.submit_iron_condor(
                 put_wing_contract=put_wing.contract,
                 put_contract=put_option.contract,
@@ -568,6 +604,8 @@ class ConnectionManager:
     
     def disconnect(self):
         """Gracefully disconnect from TWS"""
+        # Write out any price adjustments still queued for the database
+        self.db.flush()
         if self.tws and self.tws.isConnected():
             print("\nDisconnecting from TWS...")
             self.tws.disconnect()
@@ -727,13 +765,16 @@ def execute_double_calendar(connection_manager: ConnectionManager, config: Trade
         
         print(f"\nTotal Debit: {total_debit:.2f}")
         
-        # Record option legs
-        connection_manager.db.record_option_leg(trade_id, "short_put", short_put)
-        connection_manager.db.record_option_leg(trade_id, "long_put", long_put)
-        connection_manager.db.record_option_leg(trade_id, "short_call", short_call)
-        connection_manager.db.record_option_leg(trade_id, "long_call", long_call)
+        # Record option legs in one transaction
+        connection_manager.db.record_option_legs(trade_id, [
+            ("short_put", short_put),
+            ("long_put", long_put),
+            ("short_call", short_call),
+            ("long_call", long_call)
+        ])
         
         # Submit the order
+        flush_price_cache()
         order_id = tws.submit_double_calendar(
             short_put_contract=short_put.contract,
             long_put_contract=long_put.contract,
@@ -863,7 +904,7 @@ def execute_double_calendar(connection_manager: ConnectionManager, config: Trade
             )
         else:
             # Order was filled
-            fill_time = datetime.now(pytz.timezone('US/Eastern')).isoformat()
+            fill_time = datetime.now(ET_TIMEZONE)
             connection_manager.db.record_trade_attempt(
                 config=config,
                 spx_price=spx_price,
@@ -886,40 +927,57 @@ def execute_double_calendar(connection_manager: ConnectionManager, config: Trade
         )
         raise
 
+# Double calendar configs by number, plus when the scheduler runs each one
+_DC_CONFIGS = {
+    1: DC_CONFIG, 2: DC_CONFIG_2, 3: DC_CONFIG_3,
+    4: DC_CONFIG_4, 5: DC_CONFIG_5, 6: DC_CONFIG_6
+}
+_DC_SCHEDULE = (  # (config number, entry time ET, day or None for the default)
+    (1, "10:15", None),
+    (2, "11:55", None),
+    (3, "13:00", None),
+    (4, "14:10", None),
+    (5, "12:00", "Monday"),
+    (6, "13:30", "Monday"),
+)
+
+def execute_dc(connection_manager, n: int):
+    """Execute double calendar config number n"""
+    return execute_double_calendar(connection_manager, config=_DC_CONFIGS[n])
+
+# Kept for callers of the old per-config wrappers
 def execute_dc_config_2(connection_manager):
-    """Wrapper function to execute DC_CONFIG_2"""
-    return execute_double_calendar(connection_manager, config=DC_CONFIG_2)
+    return execute_dc(connection_manager, 2)
 
 def execute_dc_config_3(connection_manager):
-    """Wrapper function to execute DC_CONFIG_3"""
-    return execute_double_calendar(connection_manager, config=DC_CONFIG_3)
+    return execute_dc(connection_manager, 3)
 
 def execute_dc_config_4(connection_manager):
-    """Wrapper function to execute DC_CONFIG_4"""
-    return execute_double_calendar(connection_manager, config=DC_CONFIG_4)
+    return execute_dc(connection_manager, 4)
 
 def execute_dc_config_5(connection_manager):
-    """Wrapper function to execute DC_CONFIG_5"""
-    return execute_double_calendar(connection_manager, config=DC_CONFIG_5)
+    return execute_dc(connection_manager, 5)
 
 def execute_dc_config_6(connection_manager):
-    """Wrapper function to execute DC_CONFIG_6"""
-    return execute_double_calendar(connection_manager, config=DC_CONFIG_6)
+    return execute_dc(connection_manager, 6)
 
 def check_recent_trades():
     """Check the most recent trades in the database"""
     db = TradeDatabase()
-    print("\nQuerying recent trades...")
-    recent_trades = db.get_recent_trades(limit=5)
-    print(f"Found {len(recent_trades)} trades")
-    
-    if not recent_trades:
-        print("No trades found in database")
-        return
+    try:
+        print("\nQuerying recent trades...")
+        recent_trades = db.get_recent_trades(limit=5)
+        print(f"Found {len(recent_trades)} trades")
         
-    print("\nMost Recent Trades:")
-    for trade_details in recent_trades:
-        db.print_trade_summary(trade_details)
+        if not recent_trades:
+            print("No trades found in database")
+            return
+            
+        print("\nMost Recent Trades:")
+        for trade_details in recent_trades:
+            db.print_trade_summary(trade_details)
+    finally:
+        db.close()
 
 def main(stop_event=None, message_queue=None):
     """Main function that sets up the scheduler and connection manager"""
@@ -940,7 +998,7 @@ def main(stop_event=None, message_queue=None):
         if not message_queue:
             return
             
-        et_now = datetime.now(pytz.timezone('US/Eastern'))
+        et_now = datetime.now(ET_TIMEZONE)
         is_connected = False
         
         if connection_manager and connection_manager.tws:
@@ -994,50 +1052,14 @@ def main(stop_event=None, message_queue=None):
                 if not scheduler:
                     scheduler = TradeScheduler()
                     
-                    # Schedule all trades
-                    # Schedule the first double calendar trade for 10:15 ET every Friday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG.trade_name,
-                        time_et="10:15",
-                        trade_func=lambda: execute_double_calendar(connection_manager)
-                    )
-                    
-                    # Schedule the second double calendar trade for 11:55 ET every Friday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG_2.trade_name,
-                        time_et="11:55",
-                        trade_func=lambda: execute_dc_config_2(connection_manager)
-                    )
-                    
-                    # Schedule the third double calendar trade for 13:00 ET every Friday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG_3.trade_name,
-                        time_et="13:00",
-                        trade_func=lambda: execute_dc_config_3(connection_manager)
-                    )
-                    
-                    # Schedule the fourth double calendar trade for 14:10 ET every Friday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG_4.trade_name,
-                        time_et="14:10",
-                        trade_func=lambda: execute_dc_config_4(connection_manager)
-                    )
-                    
-                    # Schedule the fifth double calendar trade for 12:00 ET every Monday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG_5.trade_name,  # Will generate "DC_3D_77D_1217_0"
-                        time_et="12:00",
-                        trade_func=lambda: execute_dc_config_5(connection_manager),
-                        day="Monday"
-                    )
-                    
-                    # Schedule the sixth double calendar trade for 13:30 ET every Monday
-                    scheduler.add_trade(
-                        trade_name=DC_CONFIG_6.trade_name,  # Will generate "DC_1D_44D_2525_0"
-                        time_et="13:30",
-                        trade_func=lambda: execute_dc_config_6(connection_manager),
-                        day="Monday"
-                    )
+                    # Schedule all double calendar trades (Friday unless noted)
+                    for n, time_et, day in _DC_SCHEDULE:
+                        scheduler.add_trade(
+                            trade_name=_DC_CONFIGS[n].trade_name,
+                            time_et=time_et,
+                            trade_func=partial(execute_dc, connection_manager, n),
+                            **({"day": day} if day else {})
+                        )
                     
                     scheduler.list_trades()
                     log_message("\n⚡ Trade scheduler is running...")
@@ -1104,6 +1126,7 @@ def main(stop_event=None, message_queue=None):
         if connection_manager:
             try:
                 connection_manager.disconnect()
+                connection_manager.db.close()
             except:
                 pass
         log_message("\nTrading system shutdown complete.")
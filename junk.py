@@ -4,7 +4,6 @@ from ibapi.contract import Contract
 from threading import Thread, Lock
 import time
 import datetime
-import pytz
 
 class TestWrapper(EWrapper):
     def __init__(self):
@@ -3,20 +3,37 @@ from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract, ComboLeg
 from ibapi.order import Order
 from ibapi.tag_value import TagValue
-from threading import Thread, Event
+from threading import Thread, Event, Timer
 import time
+import logging
+import logging.handlers
+import queue
 from datetime import datetime
-import pytz
 import requests
 from datetime import timedelta
 import json
+import copy
+from bisect import bisect_left, bisect_right
 from typing import List
-import schedule
+
+SPX_CON_ID = 416904  # SPX index conId, used for reqSecDefOptParams
+STRIKE_WINDOW = 100  # Only fetch contract details within +/- this of spot
+
+# EWrapper callbacks run on the API reader thread, so they only enqueue log
+# records; main() runs the listener that does the (blocking) stdout writes
+_log_queue = queue.Queue(-1)
+
+logger = logging.getLogger("test_options")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
 
 class TestWrapper(EWrapper):
     def __init__(self):
         super().__init__()
         self.data = []
+        self.contracts_by_id = {}  # self.data entries keyed by conId
+        self.contract_keys = {}  # (strike, right) by conId, read per tick
         self.chain_complete = Event()
         self.current_price = None
         self.option_data = {}  # Store option data by conId
@@ -25,21 +42,34 @@ class TestWrapper(EWrapper):
         self.order_status = {}  # Track order status
         self.fill_event = Event()  # Add this to track fills
         self.executions = {}  # Track executions
+        self._leg_cache = {}  # ComboLeg skeletons by (right, strike)
+        self.option_strikes = set()  # Strike grid from reqSecDefOptParams
+        self.option_expirations = set()
+        self._strike_grid = []  # option_strikes, sorted once per fetch
+        self.params_complete = Event()
+        self._pending_details = set()  # Outstanding reqContractDetails ids
+        self._pending_quotes = set()  # conIds still waiting on their snapshot
+        self.quotes_complete = Event()
 
     def error(self, reqId, errorCode, errorString, advancedOrderRejectJson=""):
-        print(f'Error {errorCode}: {errorString}')
+        logger.info("Error %s: %s", errorCode, errorString)
         if advancedOrderRejectJson:
-            print(f"Advanced Info: {advancedOrderRejectJson}")
+            logger.info("Advanced Info: %s", advancedOrderRejectJson)
+        
+        # A failed details request (e.g. a grid strike not listed for this
+        # expiry) never gets contractDetailsEnd, so count it as finished here
+        if reqId in self._pending_details:
+            self._details_done(reqId)
 
     def tickPrice(self, reqId: int, tickType: int, price: float, attrib):
         if reqId == 0:  # SPX index
             if tickType == 4:  # Last price during RTH
                 self.current_price = price
-                print(f"SPX last price: {price}")
+                logger.info("SPX last price: %s", price)
             elif tickType == 9:  # Close price
                 if not self.current_price:  # Only use close if we don't have last
                     self.current_price = price
-                    print(f"SPX close price: {price}")
+                    logger.info("SPX close price: %s", price)
         else:  # Option prices
             if tickType == 1:  # Bid
                 if reqId not in self.option_data:
@@ -59,30 +89,81 @@ class TestWrapper(EWrapper):
         if tickType == 13 and delta is not None:
             if reqId not in self.option_data:
                 self.option_data[reqId] = {}
+            strike, right = self.contract_keys.get(reqId, (None, None))
             self.option_data[reqId].update({
                 'delta': abs(delta),
-                'strike': next((opt['strike'] for opt in self.data if opt['contract'].conId == reqId), None),
-                'right': next((opt['contract'].right for opt in self.data if opt['contract'].conId == reqId), None)
+                'strike': strike,
+                'right': right
             })
 
+    def tickByTickBidAsk(self, reqId, time, bidPrice, askPrice, bidSize, askSize, tickAttribBidAsk):
+        """Handle tick-by-tick quotes for legs of a working order"""
+        quote = self.option_data.setdefault(reqId, {})
+        quote['bid'] = bidPrice
+        quote['ask'] = askPrice
+        quote['mid'] = (bidPrice + askPrice) / 2
+
     def contractDetails(self, reqId, contractDetails):
         """Handle contract details and request market data"""
+        contract = contractDetails.contract
         contract_data = {
-            'contract': contractDetails.contract,
-            'strike': contractDetails.contract.strike,
+            'contract': contract,
+            'strike': contract.strike,
             'bid': 0,
             'ask': 0
         }
         self.data.append(contract_data)
-        
-        # Request market data for this option
-        self.reqMktData(contractDetails.contract.conId, contractDetails.contract, "", False, False, [])
+        self.contracts_by_id[contract.conId] = contract_data
+        self.contract_keys[contract.conId] = (contract.strike, contract.right)
+        
+        # One-shot snapshot is enough for pricing the chain
+        self._pending_quotes.add(contractDetails.contract.conId)
+        self.reqMktData(contractDetails.contract.conId, contractDetails.contract, "", True, False, [])
+
+    def securityDefinitionOptionParameter(self, reqId, exchange, underlyingConId,
+                                          tradingClass, multiplier, expirations, strikes):
+        """Collect the SPXW strike/expiry grid"""
+        if tradingClass == "SPXW":
+            self.option_expirations.update(expirations)
+            self.option_strikes.update(strikes)
+
+    def securityDefinitionOptionParameterEnd(self, reqId):
+        """Handle end of option parameters"""
+        self._strike_grid = sorted(self.option_strikes)
+        logger.info("Option parameters received: %d strikes", len(self._strike_grid))
+        self.params_complete.set()
 
     def contractDetailsEnd(self, reqId):
         """Handle end of contract details"""
-        print(f"Contract details request {reqId} completed.")
-        print(f"Received {len(self.data)} contracts total.")
+        self._details_done(reqId)
+
+    def _details_done(self, reqId):
+        """Mark a details request finished; build the leg cache after the last one"""
+        self._pending_details.discard(reqId)
+        if self._pending_details:
+            return
+        
+        logger.info("Contract details request %s completed.", reqId)
+        logger.info("Received %d contracts total.", len(self.data))
+        
+        # Pre-build combo legs so order creation is a lookup + copy
+        self._leg_cache = {}
+        for opt in self.data:
+            leg = ComboLeg()
+            leg.conId = opt['contract'].conId
+            leg.ratio = 1
+            leg.exchange = "CBOE"
+            self._leg_cache[(opt['contract'].right, opt['contract'].strike)] = leg
+        
         self.chain_complete.set()
+        if not self._pending_quotes:
+            self.quotes_complete.set()
+
+    def tickSnapshotEnd(self, reqId: int):
+        """Signal once every option snapshot in the chain has landed"""
+        self._pending_quotes.discard(reqId)
+        if not self._pending_quotes and not self._pending_details:
+            self.quotes_complete.set()
 
     def nextValidId(self, orderId: int):
         """Called by TWS with next valid order ID"""
@@ -101,32 +182,31 @@ class TestWrapper(EWrapper):
             'lastFillPrice': lastFillPrice,
             'whyHeld': whyHeld
         }
-        print(f"\nOrder {orderId} Status: {status}")
-        print(f"Filled: {filled}, Remaining: {remaining}")
+        logger.info("\nOrder %s Status: %s\nFilled: %s, Remaining: %s", orderId, status, filled, remaining)
         if avgFillPrice:
-            print(f"Avg Fill Price: {avgFillPrice}")
+            logger.info("Avg Fill Price: %s", avgFillPrice)
         if whyHeld:
-            print(f"Why Held: {whyHeld}")
+            logger.info("Why Held: %s", whyHeld)
         
         if status == "Filled":
             self.fill_event.set()
+        
+        # Terminal orders no longer need their status kept around
+        if status in ("Filled", "Cancelled", "ApiCancelled", "Inactive"):
+            self.order_status.pop(orderId, None)
 
     def openOrder(self, orderId, contract, order, orderState):
         """Called when order is submitted/modified"""
-        print(f"\nOrder {orderId} {orderState.status}:")
-        print(f"  Action: {order.action}")
-        print(f"  Quantity: {order.totalQuantity}")
-        print(f"  Order Type: {order.orderType}")
-        print(f"  Limit Price: {order.lmtPrice}")
+        logger.info("\nOrder %s %s:\n  Action: %s\n  Quantity: %s\n  Order Type: %s\n  Limit Price: %s",
+                    orderId, orderState.status, order.action, order.totalQuantity,
+                    order.orderType, order.lmtPrice)
         if orderState.commission:
-            print(f"  Commission: {orderState.commission}")
+            logger.info("  Commission: %s", orderState.commission)
 
     def execDetails(self, reqId, contract, execution):
         """Called when order is executed"""
-        print(f"\nExecution: Order {execution.orderId}")
-        print(f"  Time: {execution.time}")
-        print(f"  Shares: {execution.shares}")
-        print(f"  Price: {execution.price}")
+        logger.info("\nExecution: Order %s\n  Time: %s\n  Shares: %s\n  Price: %s",
+                    execution.orderId, execution.time, execution.shares, execution.price)
         
         # Store execution details
         self.executions[execution.execId] = {
@@ -138,14 +218,16 @@ class TestWrapper(EWrapper):
 
     def commissionReport(self, commissionReport):
         """Called when commission info is available"""
-        execId = commissionReport.execId
-        if execId in self.executions:
-            print(f"  Commission: {commissionReport.commission}")
-            self.executions[execId]['commission'] = commissionReport.commission
+        # The commission report is the last callback for an execution
+        execution = self.executions.pop(commissionReport.execId, None)
+        if execution is not None:
+            logger.info("  Commission: %s", commissionReport.commission)
 
 def round_to_nickel(price):
-    """Round a price to the nearest nickel"""
-    return round(price * 20) / 20
+    """Round a price to the nearest nickel (half away from zero)"""
+    if price >= 0:
+        return int(price * 20 + 0.5) / 20
+    return -int(-price * 20 + 0.5) / 20
 
 class TestApp(EClient, TestWrapper):
     def __init__(self, dte):
@@ -159,6 +241,7 @@ class TestApp(EClient, TestWrapper):
         self.price_received = Event()
         self.current_price = None
         self.next_order_id = 1
+        self._trade_timer = None
 
     def start_connection(self):
         """Connect to TWS/IB Gateway"""
@@ -190,43 +273,76 @@ class TestApp(EClient, TestWrapper):
         """Handle price updates"""
         if reqId == 1001 and tickType == 4:  # Last price for SPX
             self.current_price = price
-            print(f"SPX price: {price}")
+            logger.info("SPX price: %s", price)
             self.price_received.set()
             
             # Cancel subscription after receiving price
             self.cancelMktData(reqId)
-        elif tickType == 1:  # Bid
-            for opt in self.data:
-                if opt['contract'].conId == reqId:
-                    opt['bid'] = price
-                    break
-        elif tickType == 2:  # Ask
-            for opt in self.data:
-                if opt['contract'].conId == reqId:
-                    opt['ask'] = price
-                    break
+        elif tickType in (1, 2):  # Bid / Ask
+            opt = self.contracts_by_id.get(reqId)
+            if opt is not None:
+                opt['bid' if tickType == 1 else 'ask'] = price
 
     def request_options(self):
         """Request options chain and market data"""
-        if not self.started:
+        if not self.started or not self.current_price:
             return
         
         # Clear previous data
         self.data = []
+        self.contracts_by_id = {}
+        self.contract_keys = {}
+        self.option_data = {}
+        self.chain_complete.clear()
+        self._pending_quotes = set()
+        self.quotes_complete.clear()
+        
+        expiry = self.get_expiration_by_dte(self.dte)
         
+        # Fetch the strike grid only when the expiry isn't already known
+        if expiry not in self.option_expirations:
+            self.params_complete.clear()
+            self.option_strikes = set()
+            self.option_expirations = set()
+            req_id = self.next_req_id
+            self.next_req_id += 1
+            self.reqSecDefOptParams(req_id, "SPX", "", "IND", SPX_CON_ID)
+            if not self.params_complete.wait(10):
+                print("Timed out waiting for option parameters")
+                return
+        
+        if expiry not in self.option_expirations:
+            print(f"Expiry {expiry} not listed for SPXW")
+            return
+        
+        # Binary search the sorted grid for the window around spot
+        grid = self._strike_grid
+        lo = bisect_left(grid, self.current_price - STRIKE_WINDOW)
+        hi = bisect_right(grid, self.current_price + STRIKE_WINDOW)
+        strikes = grid[lo:hi]
+        if not strikes:
+            print(f"No strikes within {STRIKE_WINDOW} points of {self.current_price}")
+            return
+        print(f"\nRequesting {len(strikes)} strikes for expiry: {expiry}")
+        
+        # Request contract details only for strikes near the money
+        self._pending_details = set(range(self.next_req_id, self.next_req_id + len(strikes)))
+        for strike in strikes:
+            contract = self._option_contract(expiry)
+            contract.strike = strike
+            self.reqContractDetails(self.next_req_id, contract)
+            self.next_req_id += 1
+
+    def _option_contract(self, expiry: str) -> Contract:
+        """Build an SPXW option contract for the given expiry"""
         contract = Contract()
         contract.symbol = "SPX"
         contract.secType = "OPT"
         contract.exchange = "CBOE"
         contract.currency = "USD"
         contract.tradingClass = "SPXW"  # Add trading class for weeklys
-        
-        expiry = self.get_expiration_by_dte(self.dte)
-        print(f"\nRequesting options chain for expiry: {expiry}")
         contract.lastTradeDateOrContractMonth = expiry
-        
-        # Request contract details
-        self.reqContractDetails(1, contract)
+        return contract
 
     def get_cboe_calendar(self) -> List[str]:
         """Get CBOE trading calendar from their API"""
@@ -317,45 +433,14 @@ class TestApp(EClient, TestWrapper):
         # Define the legs
         legs = []
         
-        # Short Put
-        short_put = ComboLeg()
-        short_put.conId = next(opt['contract'].conId for opt in self.data 
-                              if opt['contract'].right == 'P' 
-                              and opt['contract'].strike == short_put_strike)
-        short_put.ratio = 1
-        short_put.action = "SELL"
-        short_put.exchange = "CBOE"
-        legs.append(short_put)
-
-        # Long Put
-        long_put = ComboLeg()
-        long_put.conId = next(opt['contract'].conId for opt in self.data 
-                             if opt['contract'].right == 'P' 
-                             and opt['contract'].strike == long_put_strike)
-        long_put.ratio = 1
-        long_put.action = "BUY"
-        long_put.exchange = "CBOE"
-        legs.append(long_put)
-
-        # Short Call
-        short_call = ComboLeg()
-        short_call.conId = next(opt['contract'].conId for opt in self.data 
-                               if opt['contract'].right == 'C' 
-                               and opt['contract'].strike == short_call_strike)
-        short_call.ratio = 1
-        short_call.action = "SELL"
-        short_call.exchange = "CBOE"
-        legs.append(short_call)
-
-        # Long Call
-        long_call = ComboLeg()
-        long_call.conId = next(opt['contract'].conId for opt in self.data 
-                              if opt['contract'].right == 'C' 
-                              and opt['contract'].strike == long_call_strike)
-        long_call.ratio = 1
-        long_call.action = "BUY"
-        long_call.exchange = "CBOE"
-        legs.append(long_call)
+        # Short Put, Long Put, Short Call, Long Call
+        for right, strike, action in (("P", short_put_strike, "SELL"),
+                                      ("P", long_put_strike, "BUY"),
+                                      ("C", short_call_strike, "SELL"),
+                                      ("C", long_call_strike, "BUY")):
+            leg = copy.copy(self._leg_cache[(right, strike)])
+            leg.action = action
+            legs.append(leg)
 
         contract.comboLegs = legs
 
@@ -378,20 +463,29 @@ class TestApp(EClient, TestWrapper):
         Returns the new credit amount (positive number)
         """
         # Calculate 1% reduction
-        one_percent = self.round_to_nickel(current_credit * 0.99)
+        one_percent = round_to_nickel(current_credit * 0.99)
         
         # If the change is less than 0.05, force a 0.05 reduction
         if current_credit - one_percent < 0.05:
-            return self.round_to_nickel(current_credit - 0.05)
+            return round_to_nickel(current_credit - 0.05)
         
         return one_percent
 
+    def _combo_mid_credit(self, contract):
+        """Combo credit at current mids, or None until every leg is quoted"""
+        # Short legs are tick-by-tick while the order works; long legs keep
+        # their chain snapshot
+        credit = 0
+        for leg in contract.comboLegs:
+            mid = self.option_data.get(leg.conId, {}).get('mid')
+            if mid is None:
+                return None
+            credit += mid if leg.action == "SELL" else -mid
+        return credit
+
     def manage_iron_condor_order(self, contract, order, target_credit):
         """Manage iron condor order with adjustments"""
         
-        def round_to_nickel(price):
-            return round(price * 20) / 20
-        
         # Initialize tracking variables
         start_time = time.time()
         current_credit = target_credit
@@ -400,37 +494,65 @@ class TestApp(EClient, TestWrapper):
         
         # Place initial order
         print(f"\nPlacing initial order {order.orderRef} at {target_credit} credit...")
+        self.fill_event.clear()
         self.placeOrder(order_id, contract, order)
         
+        # Stream tick-by-tick quotes on the short legs while the order works
+        short_leg_ids = [leg.conId for leg in contract.comboLegs if leg.action == "SELL"]
+        for con_id in short_leg_ids:
+            opt = self.contracts_by_id.get(con_id)
+            if opt is not None:
+                self.reqTickByTickData(con_id, opt['contract'], "BidAsk", 0, True)
+        
+        # Adjust credit after 2, 3, and 4 minutes (1%, 2%, 3% total reduction),
+        # give up after 5 minutes
+        thresholds = (120, 180, 240, 300)
+        factors = (0.99, 0.98, 0.97)
+        labels = ("First adjustment", "Second adjustment", "Final adjustment")
+        stage = 0
+        
         # Track order status
         while True:
+            # Stop once the working order fills, so no stage re-places it
+            if self.fill_event.is_set():
+                print(f"\nOrder {order_id} filled at {current_credit} credit")
+                break
+            
             elapsed = time.time() - start_time
             
             # After 5 minutes, cancel and exit
-            if elapsed > 300:  # 5 minutes
+            if elapsed > thresholds[3]:
                 print(f"\nReached maximum time (5 minutes). Cancelling order.")
                 self.cancelOrder(order_id)
                 break
             
-            # Adjust credit after 2, 3, and 4 minutes
-            if elapsed > 240 and current_credit == target_credit:  # 4 minutes
-                new_credit = round_to_nickel(current_credit * 0.97)  # 3% total reduction
-                print(f"\nFinal adjustment: reducing credit from {current_credit} to {new_credit}")
-            elif elapsed > 180 and current_credit == target_credit:  # 3 minutes
-                new_credit = round_to_nickel(current_credit * 0.98)  # 2% total reduction
-                print(f"\nSecond adjustment: reducing credit from {current_credit} to {new_credit}")
-            elif elapsed > 120 and current_credit == target_credit:  # 2 minutes
-                new_credit = round_to_nickel(current_credit * 0.99)  # 1% reduction
-                print(f"\nFirst adjustment: reducing credit from {current_credit} to {new_credit}")
-            else:
-                time.sleep(1)
+            if stage == 3 or elapsed <= thresholds[stage]:
+                self.fill_event.wait(1)
                 continue
             
+            # Don't give up more credit than the market asks: if the live mid
+            # credit is above the scheduled step, reprice to the mid instead
+            new_credit = round_to_nickel(target_credit * factors[stage])
+            live_credit = self._combo_mid_credit(contract)
+            stage += 1
+            if live_credit is not None:
+                live_credit = round_to_nickel(live_credit)
+                if live_credit >= current_credit:
+                    print(f"\nLive mid credit {live_credit} still covers {current_credit} - keeping order")
+                    continue
+                new_credit = max(new_credit, live_credit)
+            print(f"\n{labels[stage - 1]}: reducing credit from {current_credit} to {new_credit}")
+            
             # Cancel existing order
             print(f"Cancelling order {order_id}")
             self.cancelOrder(order_id)
             time.sleep(1)  # Wait for cancellation
             
+            # The order may have filled before the cancel reached it
+            if self.fill_event.is_set():
+                print(f"Order {order_id} filled before cancellation - not re-placing")
+                break
+            
             # Create new order with adjusted credit
             new_order = Order()
             new_order.action = "BUY"
@@ -446,6 +568,7 @@ class TestApp(EClient, TestWrapper):
             self.next_order_id += 1
             
             print(f"Placing new order {new_order_id} ({new_order.orderRef}) at {new_credit} credit...")
+            self.fill_event.clear()
             self.placeOrder(new_order_id, contract, new_order)
             
             # Update tracking variables
@@ -453,6 +576,10 @@ class TestApp(EClient, TestWrapper):
             order_id = new_order_id
             
             time.sleep(1)
+        
+        for con_id in short_leg_ids:
+            self.cancelTickByTickData(con_id)
+            self.option_data.pop(con_id, None)
 
     def analyze_chain(self):
         """Analyze options chain and place trade"""
@@ -462,46 +589,57 @@ class TestApp(EClient, TestWrapper):
         
         print(f"\nAnalyzing chain with SPX at {self.current_price}")
         
-        # Wait for market data
-        time.sleep(2)
-        
-        # Separate puts and calls
-        puts = []
-        calls = []
+        # Wait for the snapshots; IB ends a snapshot within ~11 seconds
+        if not self.quotes_complete.wait(11):
+            print(f"Still missing quotes for {len(self._pending_quotes)} options")
         
+        # Find the put closest to 1.60 and call closest to 1.30
+        target_put_price = 1.60
+        target_call_price = 1.30
+
+        # Single pass: compute midpoints, index by strike and track the
+        # closest put/call to target as we go
+        puts = {}
+        calls = {}
+        short_put = short_call = None
+        put_diff = call_diff = float('inf')
+
         for opt in self.data:
             if 'bid' not in opt or 'ask' not in opt:
                 continue
-            
+
             # Calculate midpoint
-            opt['midpoint'] = (opt['bid'] + opt['ask']) / 2
-            
-            if opt['contract'].right == 'P':
-                puts.append(opt)
-            elif opt['contract'].right == 'C':
-                calls.append(opt)
-        
+            mid = opt['midpoint'] = (opt['bid'] + opt['ask']) / 2
+            strike, right = self.contract_keys[opt['contract'].conId]
+
+            if right == 'P':
+                puts[strike] = opt
+                diff = abs(mid - target_put_price)
+                if diff < put_diff:
+                    put_diff, short_put = diff, opt
+            elif right == 'C':
+                calls[strike] = opt
+                diff = abs(mid - target_call_price)
+                if diff < call_diff:
+                    call_diff, short_call = diff, opt
+
         if not puts or not calls:
             print("No valid options found")
             return
-        
-        # Find the put closest to 1.60 and call closest to 1.30
-        target_put_price = 1.60
-        target_call_price = 1.30
-        
-        short_put = min(puts, key=lambda x: abs(x['midpoint'] - target_put_price))
-        short_call = min(calls, key=lambda x: abs(x['midpoint'] - target_call_price))
-        
-        short_put_strike = short_put['contract'].strike
-        short_call_strike = short_call['contract'].strike
-        
+
+        short_put_strike = short_put['strike']
+        short_call_strike = short_call['strike']
+
         # 30-point wings
         long_put_strike = short_put_strike - 30
         long_call_strike = short_call_strike + 30
-        
+
         # Find the long options
-        long_put = next(opt for opt in puts if opt['contract'].strike == long_put_strike)
-        long_call = next(opt for opt in calls if opt['contract'].strike == long_call_strike)
+        long_put = puts.get(long_put_strike)
+        long_call = calls.get(long_call_strike)
+        if long_put is None or long_call is None:
+            print(f"No wing found at {long_put_strike}P / {long_call_strike}C")
+            return
         
         # Calculate total credit: (short_put + short_call) - (long_put + long_call)
         total_credit = round_to_nickel(
@@ -522,7 +660,7 @@ class TestApp(EClient, TestWrapper):
             long_call_strike=long_call_strike,
             short_put_strike=short_put_strike,
             long_put_strike=long_put_strike,
-            expiry=puts[0]['contract'].lastTradeDateOrContractMonth,
+            expiry=short_put['contract'].lastTradeDateOrContractMonth,
             target_credit=total_credit
         )
         
@@ -553,17 +691,31 @@ class TestApp(EClient, TestWrapper):
 
     def schedule_trades(self):
         """Schedule trades for predefined times"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        
         # Schedule just once
-        schedule.clear()
-        schedule.every().day.at("10:00").do(self.start_trading)
+        if self._trade_timer:
+            self._trade_timer.cancel()
         
-        print("Trade scheduled for 10:00")
+        # Sleep until the next 10:00 instead of polling every second
+        now = datetime.now()
+        fire = now.replace(hour=10, minute=0, second=0, microsecond=0)
+        if fire <= now:
+            fire += timedelta(days=1)
+        self._trade_timer = Timer((fire - now).total_seconds(), self._run_scheduled_trade)
+        self._trade_timer.start()
+        
+        print(f"Trade scheduled for {fire:%Y-%m-%d %H:%M}")
         
         # Run once manually for testing (remove in production)
         self.start_trading()
 
+    def _run_scheduled_trade(self):
+        """Timer callback: re-arm for tomorrow, then trade"""
+        now = datetime.now()
+        fire = now.replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self._trade_timer = Timer((fire - now).total_seconds(), self._run_scheduled_trade)
+        self._trade_timer.start()
+        self.start_trading()
+
     def req_spx_price(self):
         """Request SPX price"""
         print("\nRequesting SPX price...")
@@ -578,22 +730,33 @@ class TestApp(EClient, TestWrapper):
         # Request market data
         self.reqMktData(1001, contract, "", False, False, [])
 
+def main():
+    log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+    log_listener.start()
+    try:
+        dte = 0  # 0 DTE
+        app = TestApp(dte)
+        app.connect("127.0.0.1", 7496, 1)
+        
+        # Start thread for messages
+        thread = Thread(target=app.run)
+        thread.start()
+        
+        # Wait for nextValidId rather than a fixed sleep
+        if not app.order_id_event.wait(timeout=30):
+            print("❌ Timed out waiting for TWS connection")
+            app.disconnect()
+            raise SystemExit(1)
+        
+        # Start scheduling - but don't run the loop
+        print("\nStarting trade scheduler...")
+        app.schedule_trades()
+        
+        # Keep logging up until the API connection closes
+        thread.join()
+    finally:
+        # Writes out any records still queued
+        log_listener.stop()
+
 if __name__ == "__main__":
-    dte = 0  # 0 DTE
-    app = TestApp(dte)
-    app.connect("127.0.0.1", 7496, 1)
-    
-    # Start thread for messages
-    thread = Thread(target=app.run)
-    thread.start()
-    
-    time.sleep(1)
-    
-    # Start scheduling - but don't run the loop
-    print("\nStarting trade scheduler...")
-    app.schedule_trades()
-    
-    # Don't enter the scheduler loop for testing
-    # while True:
-    #     schedule.run_pending()
-    #     time.sleep(1)
+    main()
@@ -1,288 +1,680 @@
+import os
+import queue
 import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-import pytz
 from dataclasses import asdict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from utils.date_utils import ET_TIMEZONE as _EASTERN
+
+# Bumped whenever setup_database needs to migrate existing tables
+SCHEMA_VERSION = 3
+
+# Small integer codes stored instead of repeating the type strings per row
+TRADE_TYPE_CODES = {"IC": 0, "DC": 1}
+LEG_TYPE_CODES = {"short_put": 0, "long_put": 1, "short_call": 2, "long_call": 3}
+TRADE_TYPE_NAMES = {code: name for name, code in TRADE_TYPE_CODES.items()}
+LEG_TYPE_NAMES = {code: name for name, code in LEG_TYPE_CODES.items()}
+
+# TradeType enum values -> stored abbreviation
+_TRADE_TYPE_ABBREVS = {"iron_condor": "IC", "double_calendar": "DC"}
+
+def _to_epoch_ms(value: Any) -> Any:
+    """Convert a datetime or ISO string to epoch milliseconds (None passes through)"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value  # leave unparseable legacy text untouched
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_EASTERN)
+    return int(value.timestamp() * 1000)
+
+def _format_epoch_ms(value: Any) -> Any:
+    """Render a stored epoch-ms timestamp as Eastern ISO time for display"""
+    if not isinstance(value, int):
+        return value
+    return datetime.fromtimestamp(value / 1000, _EASTERN).isoformat(timespec='seconds')
+
+_SQL_INSERT_ATTEMPT = """
+    INSERT INTO trade_attempts (
+        timestamp, trade_name, config_type, spx_price,
+        short_dte, put_long_dte, call_long_dte,
+        put_delta, call_delta, put_width, call_width,
+        quantity, status, reason_if_failed,
+        initial_debit, final_debit, fill_time, order_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Child rows are keyed (trade_attempt_id, id); id is the next number
+# within the trade, found with a primary-key seek
+_SQL_INSERT_LEG = """
+    INSERT INTO option_legs (
+        trade_attempt_id, id, leg_type, contract_symbol,
+        strike, expiry, delta, implied_vol, price
+    ) VALUES (
+        ?1, (SELECT COALESCE(MAX(id), 0) + 1 FROM option_legs WHERE trade_attempt_id = ?1),
+        ?2, ?3, ?4, ?5, ?6, ?7, ?8
+    )
+"""
+
+_SQL_INSERT_ADJ = """
+    INSERT INTO price_adjustments (
+        trade_attempt_id, id, adjustment_time, old_debit,
+        new_debit, adjustment_number
+    ) VALUES (
+        ?1, (SELECT COALESCE(MAX(id), 0) + 1 FROM price_adjustments WHERE trade_attempt_id = ?1),
+        ?2, ?3, ?4, ?5
+    )
+"""
+
+# Attempt columns for list views; get_trade_details still returns every column
+_ATTEMPT_COLS = """id, timestamp, trade_name, status, reason_if_failed, spx_price,
+           initial_debit, final_debit, fill_time"""
+
+_SQL_SELECT_HISTORY = f"""
+    SELECT {_ATTEMPT_COLS}
+    FROM trade_attempts
+    WHERE timestamp > ?
+    ORDER BY timestamp DESC
+"""
+
+_SQL_SELECT_UNFILLED = f"""
+    SELECT {_ATTEMPT_COLS}
+    FROM trade_attempts
+    WHERE status IN ('FAILED', 'NOT_FILLED')
+    ORDER BY timestamp DESC
+"""
+
+# One row per (leg, adjustment) pair; get_trade_details splits and dedupes
+_SQL_SELECT_DETAILS = """
+    SELECT a.*, l.*, p.* FROM trade_attempts a
+    LEFT JOIN option_legs l ON l.trade_attempt_id = a.id
+    LEFT JOIN price_adjustments p ON p.trade_attempt_id = a.id
+    WHERE a.id = ?
+    ORDER BY l.id, p.id
+"""
+
+# Answered entirely from idx_attempts_ts_status
+_SQL_SELECT_STATUS_COUNTS = """
+    SELECT status, COUNT(*)
+    FROM trade_attempts
+    WHERE timestamp > ?
+    GROUP BY status
+"""
+
+# Recent-trade queries select only the columns print_trade_summary shows
+_SQL_SELECT_RECENT = f"""
+    SELECT {_ATTEMPT_COLS}
+    FROM trade_attempts
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# {ids} is filled with one "?" per trade id
+_SQL_SELECT_LEGS_ORDERED = """
+    SELECT trade_attempt_id, leg_type, contract_symbol, strike, implied_vol
+    FROM option_legs
+    WHERE trade_attempt_id IN ({ids})
+    ORDER BY trade_attempt_id, leg_type
+"""
+
+_SQL_SELECT_ADJS_ORDERED = """
+    SELECT trade_attempt_id, adjustment_time, old_debit, new_debit
+    FROM price_adjustments
+    WHERE trade_attempt_id IN ({ids})
+    ORDER BY trade_attempt_id, adjustment_time
+"""
+
+_SQL_CREATE_ATTEMPTS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER NOT NULL,  -- epoch ms
+        trade_name TEXT NOT NULL,
+        config_type INTEGER NOT NULL,  -- TRADE_TYPE_CODES
+        spx_price REAL,
+        short_dte INTEGER,
+        put_long_dte INTEGER,
+        call_long_dte INTEGER,
+        put_delta REAL,
+        call_delta REAL,
+        put_width INTEGER,
+        call_width INTEGER,
+        quantity INTEGER,
+        status TEXT NOT NULL,
+        reason_if_failed TEXT,
+        initial_debit REAL,
+        final_debit REAL,
+        fill_time INTEGER,  -- epoch ms
+        order_id INTEGER
+    )
+"""
+
+# Legs and adjustments are only ever read by trade, so they are clustered
+# on (trade_attempt_id, id) without a separate rowid b-tree
+_SQL_CREATE_LEGS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER NOT NULL,
+        trade_attempt_id INTEGER NOT NULL,
+        leg_type INTEGER NOT NULL,  -- LEG_TYPE_CODES
+        contract_symbol TEXT NOT NULL,
+        strike REAL NOT NULL,
+        expiry TEXT NOT NULL,
+        delta REAL,
+        implied_vol REAL,
+        price REAL,
+        PRIMARY KEY (trade_attempt_id, id),
+        FOREIGN KEY (trade_attempt_id) REFERENCES trade_attempts (id)
+    ) WITHOUT ROWID
+"""
+
+_SQL_CREATE_ADJS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER NOT NULL,
+        trade_attempt_id INTEGER NOT NULL,
+        adjustment_time INTEGER NOT NULL,  -- epoch ms
+        old_debit REAL NOT NULL,
+        new_debit REAL NOT NULL,
+        adjustment_number INTEGER NOT NULL,
+        PRIMARY KEY (trade_attempt_id, id),
+        FOREIGN KEY (trade_attempt_id) REFERENCES trade_attempts (id)
+    ) WITHOUT ROWID
+"""
+
+# The unfilled index is partial, so its WHERE must match _SQL_SELECT_UNFILLED
+_SQL_CREATE_INDEXES = (
+    # status rides along so get_status_counts never touches the table
+    "CREATE INDEX IF NOT EXISTS idx_attempts_ts_status ON trade_attempts(timestamp, status)",
+    # Second column matches the ORDER BY in get_recent_trades, so no sort step
+    "CREATE INDEX IF NOT EXISTS idx_legs_attempt_type ON option_legs(trade_attempt_id, leg_type)",
+    "CREATE INDEX IF NOT EXISTS idx_adj_attempt_time ON price_adjustments(trade_attempt_id, adjustment_time)",
+    """CREATE INDEX IF NOT EXISTS idx_attempts_unfilled ON trade_attempts(timestamp)
+       WHERE status IN ('FAILED', 'NOT_FILLED')""",
+)
+
+# Single-column indexes replaced by the composite ones above
+_SQL_DROP_INDEXES = (
+    "DROP INDEX IF EXISTS idx_legs_attempt",
+    "DROP INDEX IF EXISTS idx_adj_attempt",
+    "DROP INDEX IF EXISTS idx_attempts_ts",
+)
+
+class TradeTransaction:
+    """Write handle yielded by TradeDatabase.trade_transaction()"""
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+    
+    def record_attempt(self, config: Any, spx_price: float, status: str, **kwargs) -> int:
+        """Record a trade attempt and return its id"""
+        self._cursor.execute(_SQL_INSERT_ATTEMPT,
+                             TradeDatabase._attempt_row(config, spx_price, status, **kwargs))
+        return self._cursor.lastrowid
+    
+    def record_leg(self, trade_attempt_id: int, leg_type: str, option: Any):
+        """Record one option leg"""
+        self._cursor.execute(_SQL_INSERT_LEG,
+                             TradeDatabase._leg_row(trade_attempt_id, leg_type, option))
+    
+    def record_legs(self, trade_attempt_id: int, legs: List[Tuple[str, Any]]):
+        """Record several (leg_type, option) legs"""
+        self._cursor.executemany(_SQL_INSERT_LEG, [
+            TradeDatabase._leg_row(trade_attempt_id, leg_type, option)
+            for leg_type, option in legs
+        ])
+    
+    def record_adjustment(self, trade_attempt_id: int, old_debit: float,
+                          new_debit: float, adjustment_number: int):
+        """Record a price adjustment"""
+        self._cursor.execute(_SQL_INSERT_ADJ, TradeDatabase._adjustment_row(
+            trade_attempt_id, old_debit, new_debit, adjustment_number
+        ))
+    
+    def record_adjustments(self, trade_attempt_id: int,
+                           adjustments: List[Tuple[float, float, int]]):
+        """Record several (old_debit, new_debit, adjustment_number) adjustments"""
+        self._cursor.executemany(_SQL_INSERT_ADJ, [
+            TradeDatabase._adjustment_row(trade_attempt_id, *adjustment)
+            for adjustment in adjustments
+        ])
 
 class TradeDatabase:
+    # Column widths per absolute db path whose schema was set up this process;
+    # executors build a TradeDatabase per trade, so the DDL is skipped while
+    # the file's user_version still says it's current
+    _initialized_paths: Dict[str, Dict[str, int]] = {}
+    
     def __init__(self, db_path="trades.db"):
         self.db_path = db_path
-        self.setup_database()
+        
+        # One long-lived connection shared by all calls; the scheduler and
+        # UI threads both write, so access is serialized with a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False,
+                                     isolation_level=None, cached_statements=128)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+        
+        # Rows index by column name as well as position
+        self._conn.row_factory = sqlite3.Row
+        
+        # Pending price adjustment rows; the writer thread starts on first use
+        self._adj_queue = queue.Queue()
+        self._adj_writer = None
+        self._adj_writer_lock = threading.Lock()  # Only one caller starts the writer
+        
+        abs_path = os.path.abspath(db_path)
+        # A deleted or recreated file reads back user_version 0, so it still
+        # gets its tables and migrations
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if abs_path in TradeDatabase._initialized_paths and version == SCHEMA_VERSION:
+            self._widths = TradeDatabase._initialized_paths[abs_path]
+        else:
+            self.setup_database()
+            TradeDatabase._initialized_paths[abs_path] = self._widths
+        
+        # Reporting reads go through a second, read-only connection so they
+        # never wait on the writer's lock; under WAL they see the last
+        # committed snapshot
+        self._ro_lock = threading.Lock()
+        self._ro_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True,
+                                        check_same_thread=False, cached_statements=128)
+        self._ro_conn.execute("PRAGMA query_only=ON")
+        self._ro_conn.execute("PRAGMA temp_store=MEMORY")
+        self._ro_conn.row_factory = sqlite3.Row
+    
+    def close(self):
+        """Close the database connections"""
+        self.flush()
+        with self._adj_writer_lock:
+            if self._adj_writer is not None:
+                # Sentinel: the writer exits instead of waiting on a closed connection
+                self._adj_queue.put(None)
+                self._adj_writer.join()
+                self._adj_writer = None
+        with self._ro_lock:
+            self._ro_conn.close()
+        with self._lock:
+            self._conn.close()
     
     def setup_database(self):
         """Create the database tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Trade attempts table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS trade_attempts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    trade_name TEXT NOT NULL,
-                    config_type TEXT NOT NULL,
-                    spx_price REAL,
-                    short_dte INTEGER,
-                    put_long_dte INTEGER,
-                    call_long_dte INTEGER,
-                    put_delta REAL,
-                    call_delta REAL,
-                    put_width INTEGER,
-                    call_width INTEGER,
-                    quantity INTEGER,
-                    status TEXT NOT NULL,
-                    reason_if_failed TEXT,
-                    initial_debit REAL,
-                    final_debit REAL,
-                    fill_time TEXT,
-                    order_id INTEGER
-                )
-            """)
-            
-            # Option legs table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS option_legs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trade_attempt_id INTEGER,
-                    leg_type TEXT NOT NULL,  -- short_put, long_put, short_call, long_call
-                    contract_symbol TEXT NOT NULL,
-                    strike REAL NOT NULL,
-                    expiry TEXT NOT NULL,
-                    delta REAL,
-                    implied_vol REAL,
-                    price REAL,
-                    FOREIGN KEY (trade_attempt_id) REFERENCES trade_attempts (id)
-                )
-            """)
+        with self._lock:
+            cursor = self._conn.cursor()
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            existing = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trade_attempts'"
+            ).fetchone()
             
-            # Price adjustments table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS price_adjustments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trade_attempt_id INTEGER,
-                    adjustment_time TEXT NOT NULL,
-                    old_debit REAL NOT NULL,
-                    new_debit REAL NOT NULL,
-                    adjustment_number INTEGER NOT NULL,
-                    FOREIGN KEY (trade_attempt_id) REFERENCES trade_attempts (id)
-                )
-            """)
-            
-            conn.commit()
+            cursor.execute("BEGIN")
+            try:
+                # Older databases stored the type columns as TEXT
+                if existing and version < 1:
+                    self._migrate_type_codes(cursor)
+                # ...and timestamps as ISO text rather than epoch ms
+                if existing and version < 2:
+                    self._migrate_epoch_timestamps(cursor)
+                # ...and legs/adjustments as rowid tables
+                if existing and version < 3:
+                    self._migrate_clustered_children(cursor)
+                
+                cursor.execute(_SQL_CREATE_ATTEMPTS.format(table="trade_attempts"))
+                cursor.execute(_SQL_CREATE_LEGS.format(table="option_legs"))
+                cursor.execute(_SQL_CREATE_ADJS.format(table="price_adjustments"))
+                for sql in _SQL_DROP_INDEXES + _SQL_CREATE_INDEXES:
+                    cursor.execute(sql)
+                
+                # Column counts for splitting joined rows back into tables
+                self._widths = {
+                    table: len(cursor.execute(f"PRAGMA table_info({table})").fetchall())
+                    for table in ("trade_attempts", "option_legs")
+                }
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+    
+    @staticmethod
+    def _rebuild_table(cursor: sqlite3.Cursor, table: str, create_sql: str,
+                       overrides: Dict[str, str]):
+        """Recreate a table from create_sql, copying rows with per-column SQL overrides"""
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+        select = ", ".join(overrides.get(col, col) for col in columns)
+        cursor.execute(create_sql.format(table=f"{table}_new"))
+        cursor.execute(f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {select} FROM {table}")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    
+    @staticmethod
+    def _code_case(column: str, codes: Dict[str, int]) -> str:
+        """SQL CASE mapping stored names to codes, leaving unknown values as-is"""
+        whens = " ".join(f"WHEN '{name}' THEN {code}" for name, code in codes.items())
+        return f"CASE {column} {whens} ELSE {column} END"
+    
+    def _migrate_type_codes(self, cursor: sqlite3.Cursor):
+        """Convert config_type and leg_type from TEXT to integer codes"""
+        print("Migrating trade database: storing trade/leg types as codes")
+        self._rebuild_table(cursor, "trade_attempts", _SQL_CREATE_ATTEMPTS, {
+            "config_type": self._code_case("config_type", TRADE_TYPE_CODES)
+        })
+        self._rebuild_table(cursor, "option_legs", _SQL_CREATE_LEGS, {
+            "leg_type": self._code_case("leg_type", LEG_TYPE_CODES)
+        })
+    
+    def _migrate_epoch_timestamps(self, cursor: sqlite3.Cursor):
+        """Convert ISO text timestamps to INTEGER epoch milliseconds"""
+        print("Migrating trade database: storing timestamps as epoch ms")
+        self._conn.create_function("to_epoch_ms", 1, _to_epoch_ms, deterministic=True)
+        self._rebuild_table(cursor, "trade_attempts", _SQL_CREATE_ATTEMPTS, {
+            "timestamp": "to_epoch_ms(timestamp)",
+            "fill_time": "to_epoch_ms(fill_time)"
+        })
+        self._rebuild_table(cursor, "price_adjustments", _SQL_CREATE_ADJS, {
+            "adjustment_time": "to_epoch_ms(adjustment_time)"
+        })
+    
+    def _migrate_clustered_children(self, cursor: sqlite3.Cursor):
+        """Rebuild option_legs and price_adjustments as WITHOUT ROWID tables"""
+        print("Migrating trade database: clustering legs/adjustments by trade")
+        self._rebuild_table(cursor, "option_legs", _SQL_CREATE_LEGS, {})
+        self._rebuild_table(cursor, "price_adjustments", _SQL_CREATE_ADJS, {})
+    
+    @staticmethod
+    def _attempt_row(config: Any, spx_price: float, status: str,
+                     reason_if_failed: Optional[str] = None,
+                     initial_debit: Optional[float] = None,
+                     final_debit: Optional[float] = None,
+                     fill_time: Optional[datetime] = None,
+                     order_id: Optional[int] = None) -> tuple:
+        """Build the trade_attempts bind parameters"""
+        now = _to_epoch_ms(datetime.now(_EASTERN))
+        trade_type = getattr(config.trade_type, 'value', config.trade_type)
+        trade_type = TRADE_TYPE_CODES[_TRADE_TYPE_ABBREVS.get(trade_type, trade_type)]
+        return (
+            now, config.trade_name, trade_type, spx_price,
+            config.short_dte, config.put_long_dte, config.call_long_dte,
+            config.put_delta, config.call_delta, config.put_width, config.call_width,
+            config.quantity, status, reason_if_failed,
+            initial_debit, final_debit, _to_epoch_ms(fill_time), order_id
+        )
+    
+    @staticmethod
+    def _leg_row(trade_attempt_id: int, leg_type: str, option: Any) -> tuple:
+        """Build the option_legs bind parameters for one leg"""
+        # Greeks are set ad hoc on the option objects, so read them with a
+        # plain dict lookup rather than getattr's full attribute search
+        contract = option.contract
+        greeks = option.__dict__
+        return (
+            trade_attempt_id,
+            LEG_TYPE_CODES[leg_type],
+            contract.localSymbol,
+            contract.strike,
+            contract.lastTradeDateOrContractMonth,
+            greeks.get('delta'),
+            greeks.get('implied_vol'),
+            greeks.get('price')
+        )
+    
+    @staticmethod
+    def _adjustment_row(trade_attempt_id: int, old_debit: float,
+                        new_debit: float, adjustment_number: int) -> tuple:
+        """Build the price_adjustments bind parameters"""
+        now = _to_epoch_ms(datetime.now(_EASTERN))
+        return (
+            trade_attempt_id,
+            now,
+            old_debit,
+            new_debit,
+            adjustment_number
+        )
+    
+    @contextmanager
+    def trade_transaction(self):
+        """Group all writes for one trade into a single transaction"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                yield TradeTransaction(cursor)
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
     
     def record_trade_attempt(self, config: Any, spx_price: float, status: str, 
                            reason_if_failed: Optional[str] = None,
                            initial_debit: Optional[float] = None,
                            final_debit: Optional[float] = None,
-                           fill_time: Optional[str] = None,
+                           fill_time: Optional[datetime] = None,
                            order_id: Optional[int] = None) -> int:
         """Record a trade attempt in the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            now = datetime.now(pytz.timezone('US/Eastern')).isoformat()
-            
-            cursor.execute("""
-                INSERT INTO trade_attempts (
-                    timestamp, trade_name, config_type, spx_price,
-                    short_dte, put_long_dte, call_long_dte,
-                    put_delta, call_delta, put_width, call_width,
-                    quantity, status, reason_if_failed,
-                    initial_debit, final_debit, fill_time, order_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                now, config.trade_name, config.trade_type, spx_price,
-                config.short_dte, config.put_long_dte, config.call_long_dte,
-                (config.put_delta() if callable(config.put_delta) else config.put_delta),
-                (config.call_delta() if callable(config.call_delta) else config.call_delta),
-                config.put_width, config.call_width,
-                config.quantity, status, reason_if_failed,
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(_SQL_INSERT_ATTEMPT, self._attempt_row(
+                config, spx_price, status, reason_if_failed,
                 initial_debit, final_debit, fill_time, order_id
             ))
-            
             return cursor.lastrowid
     
+    def record_complete_trade(self, config: Any, spx_price: float, status: str,
+                              legs: List[Tuple[str, Any]],
+                              adjustments: List[Tuple[float, float, int]] = (),
+                              **attempt_fields) -> int:
+        """Record a trade attempt with its legs and adjustments in one transaction"""
+        with self.trade_transaction() as tx:
+            trade_id = tx.record_attempt(config, spx_price, status, **attempt_fields)
+            tx.record_legs(trade_id, legs)
+            if adjustments:
+                tx.record_adjustments(trade_id, adjustments)
+        return trade_id
+    
     def record_option_leg(self, trade_attempt_id: int, leg_type: str, option: Any):
         """Record an option leg for a trade attempt"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO option_legs (
-                    trade_attempt_id, leg_type, contract_symbol,
-                    strike, expiry, delta, implied_vol, price
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                trade_attempt_id,
-                leg_type,
-                option.contract.localSymbol,
-                option.contract.strike,
-                option.contract.lastTradeDateOrContractMonth,
-                getattr(option, 'delta', None),
-                getattr(option, 'implied_vol', None),
-                getattr(option, 'price', None)
-            ))
+        with self._lock:
+            self._conn.execute(_SQL_INSERT_LEG,
+                               self._leg_row(trade_attempt_id, leg_type, option))
+    
+    def record_option_legs(self, trade_attempt_id: int, legs: List[Tuple[str, Any]]):
+        """Record several (leg_type, option) legs for a trade attempt"""
+        with self.trade_transaction() as tx:
+            tx.record_legs(trade_attempt_id, legs)
     
     def record_price_adjustment(self, trade_attempt_id: int, old_debit: float, 
                               new_debit: float, adjustment_number: int):
-        """Record a price adjustment for a trade attempt"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """Queue a price adjustment for a trade attempt"""
+        # Adjustments fire from the order-chasing loop, so the row is built
+        # here (keeping its timestamp) and written by a background thread
+        with self._adj_writer_lock:
+            if self._adj_writer is None:
+                self._adj_writer = threading.Thread(target=self._write_adjustments, daemon=True)
+                self._adj_writer.start()
+        self._adj_queue.put(self._adjustment_row(
+            trade_attempt_id, old_debit, new_debit, adjustment_number
+        ))
+    
+    def _write_adjustments(self):
+        """Background loop writing queued adjustments in batches"""
+        stopping = False
+        while not stopping:
+            batch = [self._adj_queue.get()]
+            try:
+                while len(batch) < 64:
+                    batch.append(self._adj_queue.get_nowait())
+            except queue.Empty:
+                pass
             
-            now = datetime.now(pytz.timezone('US/Eastern')).isoformat()
+            # close() queues None once everything before it is written
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+                self._adj_queue.task_done()
+            if not batch:
+                continue
             
-            cursor.execute("""
-                INSERT INTO price_adjustments (
-                    trade_attempt_id, adjustment_time, old_debit,
-                    new_debit, adjustment_number
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                trade_attempt_id,
-                now,
-                old_debit,
-                new_debit,
-                adjustment_number
-            ))
+            try:
+                with self.trade_transaction() as txn:
+                    txn._cursor.executemany(_SQL_INSERT_ADJ, batch)
+            except Exception as e:
+                print(f"❌ Failed to record {len(batch)} price adjustments: {e}")
+            finally:
+                for _ in batch:
+                    self._adj_queue.task_done()
+    
+    def flush(self):
+        """Wait until all queued price adjustments are written"""
+        self._adj_queue.join()
     
     def get_trade_history(self, days: int = 30) -> list:
         """Get trade history for the last N days"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cutoff_date = (datetime.now(pytz.timezone('US/Eastern')) -
-                          timedelta(days=days)).isoformat()
-            
-            cursor.execute("""
-                SELECT * FROM trade_attempts
-                WHERE timestamp > ?
-                ORDER BY timestamp DESC
-            """, (cutoff_date,))
+        cutoff_date = _to_epoch_ms(datetime.now(_EASTERN) - timedelta(days=days))
+        
+        with self._ro_lock:
+            cursor = self._ro_conn.cursor()
+            cursor.execute(_SQL_SELECT_HISTORY, (cutoff_date,))
             
             return cursor.fetchall()
     
+    def get_status_counts(self, days: int = 30) -> Dict[str, int]:
+        """Count trade attempts by status over the last N days"""
+        cutoff_date = _to_epoch_ms(datetime.now(_EASTERN) - timedelta(days=days))
+        
+        with self._ro_lock:
+            rows = self._ro_conn.execute(_SQL_SELECT_STATUS_COUNTS, (cutoff_date,)).fetchall()
+        
+        return {status: count for status, count in rows}
+    
     def get_unfilled_trades(self) -> list:
         """Get all trades that weren't filled"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._ro_lock:
+            cursor = self._ro_conn.cursor()
             
-            cursor.execute("""
-                SELECT * FROM trade_attempts
-                WHERE status = 'FAILED' OR status = 'NOT_FILLED'
-                ORDER BY timestamp DESC
-            """)
+            cursor.execute(_SQL_SELECT_UNFILLED)
             
             return cursor.fetchall()
     
     def get_trade_details(self, trade_attempt_id: int) -> Dict[str, Any]:
         """Get complete details for a specific trade attempt"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get trade attempt details
-            cursor.execute("SELECT * FROM trade_attempts WHERE id = ?", (trade_attempt_id,))
-            trade = cursor.fetchone()
-            
-            if not trade:
-                return None
-                
-            # Get option legs
-            cursor.execute("SELECT * FROM option_legs WHERE trade_attempt_id = ?", 
-                         (trade_attempt_id,))
-            legs = cursor.fetchall()
-            
-            # Get price adjustments
-            cursor.execute("SELECT * FROM price_adjustments WHERE trade_attempt_id = ?", 
-                         (trade_attempt_id,))
-            adjustments = cursor.fetchall()
+        self.flush()
+        with self._ro_lock:
+            cursor = self._ro_conn.cursor()
             
-            return {
-                "trade": trade,
-                "legs": legs,
-                "adjustments": adjustments
-            }
+            cursor.execute(_SQL_SELECT_DETAILS, (trade_attempt_id,))
+            rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description]
+        
+        if not rows:
+            return None
+        
+        # Split each joined row into its three tables; the cross product
+        # repeats legs and adjustments, so dedupe while keeping order.
+        # The joined column names collide (id, trade_attempt_id), so each
+        # part is returned as a dict keyed by its own table's columns
+        a_end = self._widths["trade_attempts"]
+        l_end = a_end + self._widths["option_legs"]
+        legs = dict.fromkeys(row[a_end:l_end] for row in rows if row[a_end] is not None)
+        adjustments = dict.fromkeys(row[l_end:] for row in rows if row[l_end] is not None)
+        
+        return {
+            "trade": dict(zip(names[:a_end], rows[0][:a_end])),
+            "legs": [dict(zip(names[a_end:l_end], leg)) for leg in legs],
+            "adjustments": [dict(zip(names[l_end:], adj)) for adj in adjustments]
+        }
     
     def get_recent_trades(self, limit: int = 5) -> list:
-        """Get the most recent trades with full details"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """Get the most recent trades with the details needed for a summary"""
+        self.flush()
+        with self._ro_lock:
+            cursor = self._ro_conn.cursor()
             
             # Get the most recent trade attempts
-            cursor.execute("""
-                SELECT * FROM trade_attempts
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (limit,))
+            cursor.execute(_SQL_SELECT_RECENT, (limit,))
             trades = cursor.fetchall()
+            if not trades:
+                return []
             
-            # For each trade, get its legs and adjustments
-            detailed_trades = []
-            for trade in trades:
-                trade_id = trade[0]  # Assuming id is first column
-                
-                # Get legs
-                cursor.execute("""
-                    SELECT * FROM option_legs
-                    WHERE trade_attempt_id = ?
-                    ORDER BY leg_type
-                """, (trade_id,))
-                legs = cursor.fetchall()
-                
-                # Get price adjustments
-                cursor.execute("""
-                    SELECT * FROM price_adjustments
-                    WHERE trade_attempt_id = ?
-                    ORDER BY adjustment_time
-                """, (trade_id,))
-                adjustments = cursor.fetchall()
-                
-                detailed_trades.append({
-                    "trade": trade,
-                    "legs": legs,
-                    "adjustments": adjustments
-                })
-                
-            return detailed_trades
+            # Fetch legs and adjustments for all of them at once
+            trade_ids = [trade["id"] for trade in trades]
+            placeholders = ",".join("?" * len(trade_ids))
+            legs = {trade_id: [] for trade_id in trade_ids}
+            adjustments = {trade_id: [] for trade_id in trade_ids}
+            
+            cursor.execute(_SQL_SELECT_LEGS_ORDERED.format(ids=placeholders), trade_ids)
+            for leg in cursor.fetchall():
+                legs[leg["trade_attempt_id"]].append(leg)
+            
+            cursor.execute(_SQL_SELECT_ADJS_ORDERED.format(ids=placeholders), trade_ids)
+            for adj in cursor.fetchall():
+                adjustments[adj["trade_attempt_id"]].append(adj)
+        
+        return [
+            {
+                "trade": trade,
+                "legs": legs[trade["id"]],
+                "adjustments": adjustments[trade["id"]]
+            }
+            for trade in trades
+        ]
     
     def print_trade_summary(self, trade_details: dict):
         """Print a human-readable summary of a trade"""
+        # Build the whole summary first and write it once
         trade = trade_details["trade"]
-        print("\n" + "="*50)
-        print(f"Trade: {trade[2]}")  # trade_name
-        print(f"Time: {trade[1]}")   # timestamp
-        print(f"Status: {trade[13]}")  # status
-        if trade[14]:  # reason_if_failed
-            print(f"Reason: {trade[14]}")
-        print(f"SPX Price: {trade[4]}")  # spx_price
-        if trade[15]:  # initial_debit
-            print(f"Initial Debit: {trade[15]:.2f}")
-        if trade[16]:  # final_debit
-            print(f"Final Debit: {trade[16]:.2f}")
-        if trade[17]:  # fill_time
-            print(f"Fill Time: {trade[17]}")
+        lines = ["", "="*50]
+        lines.append(f"Trade: {trade['trade_name']}")
+        lines.append(f"Time: {_format_epoch_ms(trade['timestamp'])}")
+        lines.append(f"Status: {trade['status']}")
+        if trade['reason_if_failed']:
+            lines.append(f"Reason: {trade['reason_if_failed']}")
+        lines.append(f"SPX Price: {trade['spx_price']}")
+        if trade['initial_debit']:
+            lines.append(f"Initial Debit: {trade['initial_debit']:.2f}")
+        if trade['final_debit']:
+            lines.append(f"Final Debit: {trade['final_debit']:.2f}")
+        if trade['fill_time']:
+            lines.append(f"Fill Time: {_format_epoch_ms(trade['fill_time'])}")
         
-        # Print legs if available
+        # Add legs if available
         if trade_details["legs"]:
-            print("\nOption Legs:")
+            lines.append("\nOption Legs:")
             for leg in trade_details["legs"]:
-                iv = float(leg[7]) * 100 if leg[7] is not None else None  # implied_vol (convert to percentage)
-                leg_str = f"  {leg[2]}: {leg[3]} @ {leg[4]}"  # leg_type, symbol, strike
+                iv = leg['implied_vol']
+                iv = float(iv) * 100 if iv is not None else None  # convert to percentage
+                leg_type = LEG_TYPE_NAMES.get(leg['leg_type'], leg['leg_type'])
+                leg_str = f"  {leg_type}: {leg['contract_symbol']} @ {leg['strike']}"
                 if iv is not None:
                     leg_str += f" (IV: {iv:.1f}%)"
-                print(leg_str)
+                lines.append(leg_str)
         
-        # Print adjustments if available
+        # Add adjustments if available
         if trade_details["adjustments"]:
-            print("\nPrice Adjustments:")
+            lines.append("\nPrice Adjustments:")
             for adj in trade_details["adjustments"]:
-                print(f"  {adj[2]}: {adj[3]:.2f} -> {adj[4]:.2f}")  # time, old_debit, new_debit
+                adj_time = _format_epoch_ms(adj['adjustment_time'])
+                lines.append(f"  {adj_time}: {adj['old_debit']:.2f} -> {adj['new_debit']:.2f}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
 
 def check_recent_trades():
     """Check and display the most recent trades from the database"""
     db = TradeDatabase()
-    recent_trades = db.get_recent_trades(limit=10)  # Get last 10 trades
-    
-    print("\nRecent Trades:")
-    print("=" * 50)
-    
-    for trade_details in recent_trades:
-        db.print_trade_summary(trade_details) 
\ No newline at end of file
+    try:
+        recent_trades = db.get_recent_trades(limit=10)  # Get last 10 trades
+        
+        print("\nRecent Trades:")
+        print("=" * 50)
+        
+        for trade_details in recent_trades:
+            db.print_trade_summary(trade_details)
+        
+        print("\nLast 30 Days:")
+        for status, count in sorted(db.get_status_counts(days=30).items()):
+            print(f"{status}: {count}")
+    finally:
+        db.close() 
\ No newline at end of file
@@ -1,16 +1,40 @@
 """Handles actual trade execution"""
 from typing import Optional
 from datetime import datetime
-import pytz
 from config.trade_config import TradeConfig, TradeType
 from connection.tws_manager import ConnectionManager, OptionPosition
 from trading.option_finder import find_target_delta_option, get_expiry_from_dte
 from trading.database import TradeDatabase
+from utils.date_utils import ET_TIMEZONE
 import traceback
 
+def _find_leg(tws, expiry: str, right: str, strike: float, delta: Optional[float], label: str):
+    """Find one option leg, returning (option, None) or (None, failure reason)"""
+    option = find_target_delta_option(tws, expiry, right, strike, delta)
+    if not option:
+        return None, f"no {label}"
+    return option, None
+
 class TradeExecutor:
-    def __init__(self, connection_manager: ConnectionManager):
+    def __init__(self, connection_manager: ConnectionManager, on_fill=None):
         self.connection_manager = connection_manager
+        # Called as on_fill(config, [(leg_type, option), ...]) after an entry fills
+        self.on_fill = on_fill
+        # One persistent database handle for every attempt this executor records
+        self._db = TradeDatabase()
+    
+    @property
+    def db(self) -> TradeDatabase:
+        """The shared database handle, reopened if close() was called"""
+        if self._db is None:
+            self._db = TradeDatabase()
+        return self._db
+    
+    def close(self):
+        """Flush and close the database handle"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
     
     def execute_trade(self, config: TradeConfig) -> bool:
         """Execute a trade based on its configuration"""
@@ -20,6 +44,17 @@ class TradeExecutor:
             return self.execute_iron_condor(config)
         return False
     
+    def _record_failure(self, config: TradeConfig, spx_price: float, reason: str) -> bool:
+        """Log a failed attempt with its reason and return False"""
+        print(f"❌ Trade failed: {reason}")
+        self.db.record_trade_attempt(
+            config=config,
+            spx_price=spx_price,
+            status="FAILED",
+            reason_if_failed=reason
+        )
+        return False
+    
     def execute_double_calendar(self, config: TradeConfig) -> bool:
         """Execute a double calendar spread"""
         print(f"\n🔄 Executing Double Calendar trade: {config.trade_name}")
@@ -48,25 +83,21 @@ class TradeExecutor:
             
             # Find all required options
             print("\nFinding options...")
-            near_put = find_target_delta_option(tws, near_expiry, "P", spx_price, config.legs[1].delta_target)
-            if not near_put:
-                print("❌ Failed to find near-term put")
-                return False
+            near_put, reason = _find_leg(tws, near_expiry, "P", spx_price, config.legs[1].delta_target, "near-term put")
+            if reason:
+                return self._record_failure(config, spx_price, reason)
                 
-            far_put = find_target_delta_option(tws, far_expiry, "P", near_put.contract.strike + config.legs[0].strike_offset, None)
-            if not far_put:
-                print("❌ Failed to find far-term put")
-                return False
+            far_put, reason = _find_leg(tws, far_expiry, "P", near_put.contract.strike + config.legs[0].strike_offset, None, "far-term put")
+            if reason:
+                return self._record_failure(config, spx_price, reason)
                 
-            near_call = find_target_delta_option(tws, near_expiry, "C", spx_price, config.legs[3].delta_target)
-            if not near_call:
-                print("❌ Failed to find near-term call")
-                return False
+            near_call, reason = _find_leg(tws, near_expiry, "C", spx_price, config.legs[3].delta_target, "near-term call")
+            if reason:
+                return self._record_failure(config, spx_price, reason)
                 
-            far_call = find_target_delta_option(tws, far_expiry, "C", near_call.contract.strike + config.legs[2].strike_offset, None)
-            if not far_call:
-                print("❌ Failed to find far-term call")
-                return False
+            far_call, reason = _find_leg(tws, far_expiry, "C", near_call.contract.strike + config.legs[2].strike_offset, None, "far-term call")
+            if reason:
+                return self._record_failure(config, spx_price, reason)
             
             print("\n✅ All options found, submitting order...")
             
@@ -93,19 +124,21 @@ class TradeExecutor:
         filled = tws.monitor_order(order_id, timeout_seconds=300)
         
         if filled:
+            legs = [
+                ("short_put", near_put),
+                ("long_put", far_put),
+                ("short_call", near_call),
+                ("long_call", far_call)
+            ]
             # Record the trade in database
-            db = TradeDatabase()
-            db.record_trade(
-                trade_name=config.trade_name,
-                trade_type="DOUBLE_CALENDAR",
-                entry_time=datetime.now(pytz.timezone('US/Eastern')),
-                near_expiry=near_expiry,
-                far_expiry=far_expiry,
-                put_strike=near_put.contract.strike,
-                call_strike=near_call.contract.strike,
-                quantity=1,
-                spx_price=spx_price
+            self.db.record_complete_trade(
+                config, spx_price, "FILLED",
+                legs=legs,
+                fill_time=datetime.now(ET_TIMEZONE),
+                order_id=order_id
             )
+            if self.on_fill:
+                self.on_fill(config, legs)
             return True
             
         return False
@@ -129,10 +162,21 @@ class TradeExecutor:
         expiry = get_expiry_from_dte(config.legs[0].dte)
         
         # Find options using leg configs
-        short_put = find_target_delta_option(tws, expiry, "P", spx_price, config.legs[1].delta_target)
-        long_put = find_target_delta_option(tws, expiry, "P", short_put.contract.strike + config.legs[0].strike_offset, None)
-        short_call = find_target_delta_option(tws, expiry, "C", spx_price, config.legs[2].delta_target)
-        long_call = find_target_delta_option(tws, expiry, "C", short_call.contract.strike + config.legs[3].strike_offset, None)
+        short_put, reason = _find_leg(tws, expiry, "P", spx_price, config.legs[1].delta_target, "short put")
+        if reason:
+            return self._record_failure(config, spx_price, reason)
+        
+        long_put, reason = _find_leg(tws, expiry, "P", short_put.contract.strike + config.legs[0].strike_offset, None, "long put")
+        if reason:
+            return self._record_failure(config, spx_price, reason)
+        
+        short_call, reason = _find_leg(tws, expiry, "C", spx_price, config.legs[2].delta_target, "short call")
+        if reason:
+            return self._record_failure(config, spx_price, reason)
+        
+        long_call, reason = _find_leg(tws, expiry, "C", short_call.contract.strike + config.legs[3].strike_offset, None, "long call")
+        if reason:
+            return self._record_failure(config, spx_price, reason)
         
         # Submit the order
         order_id = tws.submit_iron_condor(
@@ -152,20 +196,21 @@ class TradeExecutor:
         filled = tws.monitor_order(order_id, timeout_seconds=300)
         
         if filled:
+            legs = [
+                ("short_put", short_put),
+                ("long_put", long_put),
+                ("short_call", short_call),
+                ("long_call", long_call)
+            ]
             # Record the trade in database
-            db = TradeDatabase()
-            db.record_trade(
-                trade_name=config.trade_name,
-                trade_type="IRON_CONDOR",
-                entry_time=datetime.now(pytz.timezone('US/Eastern')),
-                expiry=expiry,
-                put_strike=short_put.contract.strike,
-                put_wing_strike=long_put.contract.strike,
-                call_strike=short_call.contract.strike,
-                call_wing_strike=long_call.contract.strike,
-                quantity=1,
-                spx_price=spx_price
+            self.db.record_complete_trade(
+                config, spx_price, "FILLED",
+                legs=legs,
+                fill_time=datetime.now(ET_TIMEZONE),
+                order_id=order_id
             )
+            if self.on_fill:
+                self.on_fill(config, legs)
             return True
             
         return False 
\ No newline at end of file
@@ -1,19 +1,56 @@
 from dataclasses import dataclass
-from datetime import datetime, time as datetime_time
+from datetime import datetime, timedelta, timezone, time as datetime_time
 from typing import Optional, List, Dict, Any
+from collections import deque
+import copy
+import heapq
 import time
 from threading import Thread
-from config.trade_config import TradeConfig, DC_CONFIG, DC_CONFIG_2, DC_CONFIG_3, DC_CONFIG_4, DC_CONFIG_5, DC_CONFIG_6, IC_CONFIG
+from config.trade_config import TradeConfig, ExitTime, ExitTimeReference, DC_CONFIG, DC_CONFIG_2, DC_CONFIG_3, DC_CONFIG_4, DC_CONFIG_5, DC_CONFIG_6, IC_CONFIG
 from connection.tws_manager import ConnectionManager, OptionPosition
 from trading.executor import TradeExecutor
 from trading.scheduler import TradeScheduler
 from utils.market_utils import is_market_hours
-import pytz
+from utils.date_utils import ET_TIMEZONE
 from ibapi.contract import Contract
 from ibapi.order import Order
 from trading.option_finder import find_target_delta_option, get_expiry_from_dte
 from trading.risk_monitor import RiskMonitor, RiskThresholds
 import threading
+from utils.log_utils import get_queue_logger, start_log_listener, stop_log_listener
+
+# Only enqueues; start() runs the listener that writes to stdout
+logger = get_queue_logger("trading.manager")
+
+# datetime.weekday() index to the day names used in TradeConfig.entry_days
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Fields shared by every SPX option leg; execute_trade copies this and sets
+# only expiry, strike and right
+_SPX_OPT_TEMPLATE = Contract()
+_SPX_OPT_TEMPLATE.symbol = "SPX"
+_SPX_OPT_TEMPLATE.secType = "OPT"
+_SPX_OPT_TEMPLATE.exchange = "CBOE"
+_SPX_OPT_TEMPLATE.currency = "USD"
+_SPX_OPT_TEMPLATE.multiplier = "100"
+
+def _parse_entry(config: TradeConfig) -> tuple:
+    """(hour, minute, entry days) for a config's entry schedule"""
+    entry_time = datetime.strptime(config.entry_time, "%H:%M").time()
+    return entry_time.hour, entry_time.minute, frozenset(config.entry_days)
+
+def _exit_epoch(exit_time: ExitTime, config: TradeConfig, entry_time: datetime) -> float:
+    """Epoch seconds at which a time-based exit falls for a trade entered at entry_time"""
+    if exit_time.reference == ExitTimeReference.SPECIFIC_DATE:
+        exit_date = datetime.strptime(exit_time.specific_date, "%Y-%m-%d").date()
+    elif exit_time.reference == ExitTimeReference.ENTRY_DAY:
+        exit_date = entry_time.astimezone(ET_TIMEZONE).date()
+    else:
+        dte = config.short_dte if exit_time.reference == ExitTimeReference.SHORT_EXPIRY else config.put_long_dte
+        exit_date = datetime.strptime(get_expiry_from_dte(dte, as_of=entry_time), "%Y%m%d").date()
+    
+    clock = datetime.strptime(exit_time.time, "%H:%M").time()
+    return datetime.combine(exit_date, clock, ET_TIMEZONE).timestamp()
 
 @dataclass
 class Position:
@@ -37,20 +74,54 @@ class ActiveTrade:
     """Represents a currently active trade"""
     config: TradeConfig
     entry_time: datetime
-    positions: List[Position]
+    positions: List[OptionPosition]  # The legs filled at entry
     current_status: dict  # Deltas, P&L, etc.
+    delta_threshold: float = float("inf")
+    profit_target: float = float("inf")
+    entry_ns: int = 0  # time.monotonic_ns() at entry_time
+    exit_offsets_ns: tuple = ()  # Time-based exits as ns after entry, earliest first
+    
+    def __post_init__(self):
+        # Resolve the numeric exit thresholds once instead of on every check
+        exits = self.config.exit_conditions
+        self.delta_threshold = float(exits.get("abs_delta_threshold", self.delta_threshold))
+        self.profit_target = float(exits.get("profit_target", self.profit_target))
+        
+        # ...and turn each ExitTime into a monotonic offset from the entry, so
+        # exit checks are integer compares unaffected by wall-clock steps
+        if self.entry_time.tzinfo is None:
+            self.entry_time = self.entry_time.replace(tzinfo=ET_TIMEZONE)
+        entry_epoch = self.entry_time.timestamp()
+        self.entry_ns = time.monotonic_ns() - int((time.time() - entry_epoch) * 1e9)
+        self.exit_offsets_ns = tuple(sorted(
+            int((_exit_epoch(exit_time, self.config, self.entry_time) - entry_epoch) * 1e9)
+            for exit_time in self.config.time_based_exits
+        ))
 
 class TradingManager:
     """Manages all trading operations"""
     def __init__(self):
         print("Initializing TradingManager...")
         self.connection_manager = ConnectionManager()
-        self.executor = TradeExecutor(self.connection_manager)
+        self.executor = TradeExecutor(self.connection_manager, on_fill=self._on_trade_filled)
         self.scheduler = None
-        self.active_trades = []
+        self.active_trades: Dict[str, ActiveTrade] = {}  # Keyed by trade id
         self.running = False
         self.risk_monitor = RiskMonitor()
         
+        # The monitoring loop blocks on these instead of polling: _wake is set
+        # by market data callbacks, _stop_event by stop()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self.monitor_thread = None
+        
+        # Only the monitoring thread acts on positions/active_trades; other
+        # threads (risk callbacks, UI) queue (op, arg) intents here instead.
+        # deque append/popleft are atomic, so no lock is needed
+        self._intents = deque()
+        # conIds with an exit order out, until the account stops reporting them
+        self._exiting = set()
+        
         # Initialize all trade configurations
         self.trade_configs = {
             # Friday DCs
@@ -67,6 +138,25 @@ class TradingManager:
             "IC_Thursday_1545": IC_CONFIG
         }
         
+        # (valid until epoch seconds, fixed-offset ET tzinfo) for _et_now
+        self._et_offset_cache = (0.0, timezone.utc)
+        
+        # Entry times parsed once, keyed by trade name
+        self._entry_schedule = {
+            config.trade_name: _parse_entry(config)
+            for config in self.trade_configs.values()
+        }
+        
+        # Min-heap of (next entry epoch seconds, trade_configs key), so
+        # get_next_trade only looks at the soonest trade
+        now = datetime.now(ET_TIMEZONE)
+        self._trigger_heap = []
+        for name, config in self.trade_configs.items():
+            trigger = self._next_trigger(config, now)
+            if trigger is not None:
+                self._trigger_heap.append((trigger, name))
+        heapq.heapify(self._trigger_heap)
+        
         # Add risk callback
         self.risk_monitor.add_risk_callback(self.handle_risk_event)
         print("TradingManager initialized")
@@ -75,63 +165,146 @@ class TradingManager:
         """Start the trading system"""
         print("Starting trading system...")
         if not self.scheduler:
+            start_log_listener()
             if self.connection_manager.connect():
                 # Add market data callback
                 self.connection_manager.wrapper._market_callbacks.append(self._on_market_data)
                 
-                from trading.scheduler import TradeScheduler
-                from trading.executor import TradeExecutor
-                executor = TradeExecutor(self.connection_manager)
-                self.scheduler = TradeScheduler(executor)
+                # TradeScheduler enters trades (and checks the connection);
+                # the monitoring loop only follows what it entered
+                self.scheduler = TradeScheduler(self.executor)
                 self.scheduler.start()
+                self.start_monitoring()
                 return True
             return False
     
     def stop(self):
         """Stop the trading system"""
         print("Stopping trading system...")
+        self.running = False
+        self._stop_event.set()
+        self._wake.set()
+        if self.monitor_thread:
+            self.monitor_thread.join(timeout=5)
+            self.monitor_thread = None
         if self.scheduler:
             self.scheduler.stop()
             self.connection_manager.disconnect()
             self.scheduler = None
+        self.executor.close()
+        stop_log_listener()  # Flushes queued records
         print("Trading system stopped")
     
+    def start_monitoring(self):
+        """Start the single monitoring thread"""
+        if self.monitor_thread and self.monitor_thread.is_alive():
+            return
+        self.running = True
+        self._stop_event.clear()
+        self.monitor_thread = Thread(target=self._monitoring_loop, daemon=True)
+        self.monitor_thread.start()
+    
     def _monitoring_loop(self):
         """Main monitoring loop that runs continuously while system is active"""
+        # One thread does active trade updates, risk checks and exits; it
+        # wakes on market data, a queued intent, or once a second
+        backoff = 1  # Seconds to pause after an error; doubles while errors persist
         while self.running:
             try:
-                # 1. Check for new trades to enter
-                next_trade = self.get_next_trade()
-                if next_trade and self._should_enter_trade(next_trade):
-                    success = self.executor.execute_trade(next_trade.config)
-                    if success:
-                        self.active_trades.append(ActiveTrade(
-                            config=next_trade.config,
-                            entry_time=datetime.now(),
-                            positions=self.executor.get_positions(),
-                            current_status={}
-                        ))
+                # 1. Track trades the scheduler just filled
+                self._drain_intents()
                 
-                # 2. Monitor active trades
-                for trade in self.active_trades:
+                # 2. Monitor active trades, deleting closed ones after the pass
+                # rather than iterating over a copy
+                to_close = []
+                for trade_id, trade in self.active_trades.items():
                     # Update trade status (deltas, P&L, etc.)
                     trade.current_status = self._update_trade_status(trade)
                     
-                    # Check exit conditions
+                    # Check exit conditions; the legs are exited in step 4
                     if self._should_exit_trade(trade):
-                        success = self.executor.exit_trade(trade)
-                        if success:
-                            self.active_trades.remove(trade)
+                        self._intents.extend(("exit", position) for position in trade.positions)
+                        to_close.append(trade_id)
+                for trade_id in to_close:
+                    del self.active_trades[trade_id]
+                
+                # 3. Check risk across every held leg in one pass
+                positions = self._held_positions()
+                for i in self.risk_monitor.check_portfolio_risk(positions):
+                    logger.warning("Risk threshold breached: %s %s %s", positions[i].contract.strike,
+                                   positions[i].contract.right, positions[i].contract.lastTradeDateOrContractMonth)
+                    self._intents.append(("exit", positions[i]))
                 
-                # 3. Update market data and status
-                self.connection_manager.update_market_data()
+                # 4. Apply queued intents, exiting each position at most once
+                self._drain_intents()
                 
-                # 4. Sleep for monitoring interval
-                time.sleep(self.monitor_interval)
+                # 5. Wait for market data or an intent, at most a second
+                self._wake.wait(timeout=1)
+                self._wake.clear()
+                backoff = 1
                 
             except Exception as e:
-                print(f"Error in monitoring loop: {str(e)}")
-                time.sleep(5)  # Add delay on error to prevent rapid retries
+                logger.error("Error in monitoring loop: %s", e)
+                # Back off to avoid rapid retries, up to 30s under steady failure
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30)
+    
+    def _drain_intents(self):
+        """Apply intents queued for the monitoring thread"""
+        # An exit stays pending until the account no longer reports the leg
+        self._exiting &= self.connection_manager.wrapper.positions.keys()
+        while self._intents:
+            op, arg = self._intents.popleft()
+            if op == "track":
+                trade_id = f"{arg.config.trade_name}_{int(arg.entry_time.timestamp())}"
+                self.active_trades[trade_id] = arg
+            elif op == "exit" and arg.contract.conId not in self._exiting:
+                if self.exit_position(arg):
+                    self._exiting.add(arg.contract.conId)
+    
+    def _held_positions(self) -> list:
+        """Live account positions for the active trades' legs and today's DC"""
+        live = self.connection_manager.wrapper.positions
+        held = {}
+        for trade in self.active_trades.values():
+            for leg in trade.positions:
+                position = live.get(leg.contract.conId)
+                if position:
+                    held[leg.contract.conId] = position
+        current = self.get_current_position()
+        if current:
+            held[current.contract.conId] = current
+        return list(held.values())
+    
+    def _on_trade_filled(self, config: TradeConfig, legs: list):
+        """Executor callback: track a filled entry by the legs it actually bought/sold"""
+        # Runs on the scheduler thread, so hand the trade to the monitoring
+        # thread. Positions are the filled contracts (by conId), not whatever
+        # else is open in the same expiries
+        positions = [
+            OptionPosition(
+                contract=option.contract,
+                position=-1 if leg_type.startswith("short") else 1,
+                market_price=option.market_price
+            )
+            for leg_type, option in legs
+        ]
+        self._intents.append(("track", ActiveTrade(
+            config=config,
+            entry_time=datetime.now(ET_TIMEZONE),
+            positions=positions,
+            current_status={}
+        )))
+        self._wake.set()
+    
+    def _advance_triggers(self):
+        """Roll entry triggers that have passed on to their next occurrence"""
+        now = time.time()
+        while self._trigger_heap and self._trigger_heap[0][0] <= now:
+            trigger, trade_name = heapq.heappop(self._trigger_heap)
+            next_trigger = self._next_trigger(self.trade_configs[trade_name], self._et_now())
+            if next_trigger is not None:
+                heapq.heappush(self._trigger_heap, (next_trigger, trade_name))
     
     def _should_enter_trade(self, trade) -> bool:
         """Check if we should enter a scheduled trade"""
@@ -156,31 +329,18 @@ class TradingManager:
         # Implement status update logic
         return {}  # Placeholder
     
-    def _is_exit_time_reached(self, exit_time: datetime, entry_time: datetime) -> bool:
-        """Check if a time-based exit condition is met"""
-        return datetime.now() >= exit_time
-    
     def _should_exit_trade(self, trade: ActiveTrade) -> bool:
         """Check if a trade should be exited"""
         status = trade.current_status
-        config = trade.config
-        
-        # Check each exit condition
-        for condition, value in config.exit_conditions.items():
-            if condition == "abs_delta_threshold":
-                if abs(status.get("delta", 0)) > value:
-                    return True
-            elif condition == "profit_target":
-                if status.get("pnl", 0) >= value:
-                    return True
-            # Add other exit condition checks
         
-        # Check time-based exits
-        for exit_time in config.time_based_exits:
-            if self._is_exit_time_reached(exit_time, trade.entry_time):
-                return True
+        # Check the thresholds resolved at entry (inf when not configured)
+        if (abs(status.get("delta", 0)) > trade.delta_threshold or
+                status.get("pnl", 0) >= trade.profit_target):
+            return True
         
-        return False
+        # Check time-based exits; they're sorted, so only the earliest matters
+        return (bool(trade.exit_offsets_ns) and
+                time.monotonic_ns() - trade.entry_ns >= trade.exit_offsets_ns[0])
     
     def get_status(self) -> dict:
         """Get current system status"""
@@ -192,37 +352,25 @@ class TradingManager:
         """Get the next scheduled trade"""
         if not self.scheduler:
             return None
-            
-        et_timezone = pytz.timezone('US/Eastern')
-        current_time = datetime.now(et_timezone)
-        current_day = current_time.strftime("%A")
-        
-        for trade in self.scheduler:
-            if current_day in trade["days"]:
-                trade_time = trade["time"]
-                if current_time.time() < trade_time:
-                    return {
-                        "name": trade["name"],
-                        "time": trade_time.strftime("%H:%M")
-                    }
+        self._advance_triggers()
+        if not self._trigger_heap:
+            return None
         
-        # Check next day's trades
-        next_day_trades = [t for t in self.scheduler if "Monday" in t["days"]]
-        if next_day_trades:
-            return {
-                "name": next_day_trades[0]["name"],
-                "time": next_day_trades[0]["time"].strftime("%H:%M")
-            }
-            
-        return None
+        # The trigger heap already orders every config by its next entry
+        trigger, trade_name = self._trigger_heap[0]
+        return {
+            "name": trade_name,
+            "time": datetime.fromtimestamp(trigger, ET_TIMEZONE).strftime("%H:%M")
+        }
 
     def get_current_position(self) -> Optional[OptionPosition]:
         """Get current DC position if any"""
+        # Filled by the wrapper's position() callbacks after reqPositions
         positions = self.connection_manager.wrapper.positions
         
         # Look for today's DC position
         expiry = get_expiry_from_dte(0)
-        for key, pos in positions.items():
+        for key, pos in list(positions.items()):
             if (pos.contract.lastTradeDateOrContractMonth == expiry and 
                 pos.contract.right == "P"):
                 return pos
@@ -231,18 +379,18 @@ class TradingManager:
     def execute_trade(self, trade_config: TradeConfig) -> bool:
         """Execute a specific trade configuration"""
         try:
-            print(f"Executing {trade_config.trade_name}")
+            logger.info("Executing %s", trade_config.trade_name)
             
             # Check if we already have a position for today
             current_position = self.get_current_position()
             if current_position:
-                print(f"Already have position for today: {current_position.position} contracts")
+                logger.info("Already have position for today: %s contracts", current_position.position)
                 return False
             
             # Get current market price
             spx_price = self.connection_manager.get_spx_price()
             if not spx_price:
-                print("Error: SPX price not available")
+                logger.error("Error: SPX price not available")
                 return False
             
             contracts = []
@@ -263,7 +411,7 @@ class TradingManager:
                         initial_strike=spx_price
                     )
                     if not option:
-                        print(f"Could not find appropriate {leg.leg_type} for delta {leg.delta_target}")
+                        logger.warning("Could not find appropriate %s for delta %s", leg.leg_type, leg.delta_target)
                         return False
                     base_strike = option.contract.strike
                     
@@ -271,16 +419,11 @@ class TradingManager:
                     # Use the corresponding short leg's strike plus offset
                     base_strike = contracts[-1].strike + leg.strike_offset
                 
-                # Create contract
-                contract = Contract()
-                contract.symbol = "SPX"
-                contract.secType = "OPT"
-                contract.exchange = "CBOE"
-                contract.currency = "USD"
+                # Create contract from the SPX option template
+                contract = copy.copy(_SPX_OPT_TEMPLATE)
                 contract.lastTradeDateOrContractMonth = expiry
                 contract.strike = base_strike
                 contract.right = leg.leg_type
-                contract.multiplier = "100"
                 contracts.append(contract)
                 
                 # Create order
@@ -296,10 +439,13 @@ class TradingManager:
                 orders[-1].transmit = True
             
             # Submit orders
-            for i, (contract, order) in enumerate(zip(contracts, orders)):
-                order_id = self.connection_manager.wrapper.next_order_id + i
+            for contract, order in zip(contracts, orders):
+                order_id = self.connection_manager.wrapper.get_next_order_id()
+                if order_id is None:
+                    logger.error("No order ID available - nextValidId not received")
+                    return False
                 self.connection_manager.client.placeOrder(order_id, contract, order)
-                print(f"Submitted {order.action} order for {contract.right} {contract.strike} {contract.lastTradeDateOrContractMonth}")
+                logger.info("Submitted %s order for %s %s %s", order.action, contract.right, contract.strike, contract.lastTradeDateOrContractMonth)
             
             # Set up monitoring for exit conditions
             if trade_config.exit_conditions:
@@ -308,38 +454,30 @@ class TradingManager:
             return True
             
         except Exception as e:
-            print(f"Error executing trade: {e}")
+            logger.error("Error executing trade: %s", e)
             return False
 
     def handle_risk_event(self, event: str, details: Dict):
         """Handle risk events"""
-        print(f"Risk Event: {event}")
-        print(f"Details: {details}")
+        logger.warning("Risk Event: %s", event)
+        logger.warning("Details: %s", details)
         
-        # Exit position if needed
+        # Exit position if needed; the monitoring thread places the order
         if event in ["DELTA_BREACH", "LOSS_BREACH"]:
             current_position = self.get_current_position()
             if current_position:
-                self.exit_position(current_position)
+                self._intents.append(("exit", current_position))
+                self._wake.set()
     
-    def monitor_positions(self):
-        """Monitor active positions for risk"""
-        while self.running:
-            try:
-                position = self.get_current_position()
-                if position:
-                    risk_status = self.risk_monitor.check_position_risk(position)
-                    if self.risk_monitor.should_exit_position(risk_status):
-                        self.exit_position(position)
-                time.sleep(1)  # Check every second
-            except Exception as e:
-                print(f"Error monitoring positions: {e}")
-                time.sleep(5) 
-
     def exit_position(self, position) -> bool:
         """Exit an existing position"""
         try:
-            print(f"Exiting position: {position.contract.strike} {position.contract.right} {position.contract.lastTradeDateOrContractMonth}")
+            logger.info("Exiting position: %s %s %s", position.contract.strike, position.contract.right, position.contract.lastTradeDateOrContractMonth)
+            
+            # Only exit legs the account still holds
+            if position.contract.conId not in self.connection_manager.wrapper.positions:
+                logger.info("Position %s already closed", position.contract.conId)
+                return False
             
             # Create exit order
             order = Order()
@@ -348,64 +486,60 @@ class TradingManager:
             order.orderType = "MKT"  # Market order for immediate exit
             order.transmit = True
             
-            # Submit order
-            if self.connection_manager.wrapper.next_order_id:
-                self.connection_manager.client.placeOrder(
-                    self.connection_manager.wrapper.next_order_id,
-                    position.contract,
-                    order
-                )
-                print(f"Exit order submitted: {self.connection_manager.wrapper.next_order_id}")
+            # Submit order; each exit takes its own order id
+            order_id = self.connection_manager.wrapper.get_next_order_id()
+            if order_id is not None:
+                self.connection_manager.client.placeOrder(order_id, position.contract, order)
+                logger.info("Exit order submitted: %s", order_id)
                 return True
             else:
-                print("No order ID available for exit")
+                logger.error("No order ID available for exit")
                 return False
             
         except Exception as e:
-            print(f"Error exiting position: {e}")
+            logger.error("Error exiting position: %s", e)
             return False 
 
+    def _et_now(self) -> datetime:
+        """Current ET time, reusing the UTC offset until the next hour boundary"""
+        # DST switches happen on the hour, so the offset can't change sooner
+        now = time.time()
+        valid_until, et_offset = self._et_offset_cache
+        if now >= valid_until:
+            et_offset = timezone(datetime.fromtimestamp(now, ET_TIMEZONE).utcoffset())
+            self._et_offset_cache = (now - now % 3600 + 3600, et_offset)
+        return datetime.fromtimestamp(now, et_offset)
+
     def check_trade_time(self, trade_config: TradeConfig) -> bool:
         """Check if it's time to execute a specific trade"""
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        current_time = now.time()
-        current_day = now.strftime('%A')
-        
-        # Convert entry_time from string to time object
-        entry_time = datetime.strptime(trade_config.entry_time, "%H:%M").time()
+        now = self._et_now()
+        schedule = self._entry_schedule.get(trade_config.trade_name)
+        if schedule is None:
+            schedule = self._entry_schedule[trade_config.trade_name] = _parse_entry(trade_config)
+        hour, minute, entry_days = schedule
         
         # Check if current day is in entry_days and time matches
-        return (current_day in trade_config.entry_days and 
-                current_time.hour == entry_time.hour and 
-                current_time.minute == entry_time.minute)
+        return (_WEEKDAYS[now.weekday()] in entry_days and 
+                now.hour == hour and 
+                now.minute == minute)
 
-    def monitor_trades(self):
-        """Monitor for trade entry opportunities"""
-        while self.running:
-            try:
-                if not is_market_hours():
-                    time.sleep(60)  # Sleep for 1 minute outside market hours
-                    continue
-                
-                # Check each trade configuration
-                for trade_name, config in self.trade_configs.items():
-                    if not config.active:
-                        continue
-                        
-                    if self.check_trade_time(config):
-                        print(f"Executing trade: {trade_name}")
-                        success = self.execute_trade(config)
-                        if success:
-                            print(f"Successfully executed {trade_name}")
-                        else:
-                            print(f"Failed to execute {trade_name}")
-                            
-                time.sleep(1)  # Check every second during market hours
-                
-            except Exception as e:
-                print(f"Error in trade monitoring: {e}")
-                time.sleep(5) 
+    def _next_trigger(self, config: TradeConfig, after: datetime) -> Optional[float]:
+        """Epoch seconds of a config's first entry time after `after`"""
+        hour, minute, entry_days = self._entry_schedule[config.trade_name]
+        for offset in range(8):
+            day = (after + timedelta(days=offset)).date()
+            entry = datetime.combine(day, datetime_time(hour, minute), ET_TIMEZONE)
+            if entry > after and _WEEKDAYS[entry.weekday()] in entry_days:
+                return entry.timestamp()
+        return None  # No entry days
+
+    def seconds_until_next_entry(self) -> Optional[float]:
+        """Seconds until the next scheduled trade's entry time"""
+        self._advance_triggers()
+        if not self._trigger_heap:
+            return None
+        return max(0, self._trigger_heap[0][0] - time.time())
 
     def _on_market_data(self, market_data):
         """Handle market data updates"""
-        pass  # Remove debug print but keep method for callback chain 
\ No newline at end of file
+        self._wake.set()  # Let the monitoring loop re-check risk on the new price 
\ No newline at end of file
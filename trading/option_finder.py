@@ -1,21 +1,19 @@
-from datetime import datetime, timedelta, time
-import pytz
+from datetime import date, datetime, timedelta, time as datetime_time
+from functools import lru_cache
 import time
 from typing import Optional
 import queue
 from connection.tws_manager import ConnectionManager, OptionPosition
-from utils.date_utils import get_next_futures_month
+from utils.date_utils import get_next_futures_month, ET_TIMEZONE
+from utils.log_utils import get_queue_logger
 
-def get_expiry_from_dte(dte: int) -> str:
-    """Calculate the expiry date string from DTE (Days To Expiry)"""
-    et_time = datetime.now(pytz.timezone('US/Eastern'))
-    
-    # If after 4:15 PM ET, start counting from tomorrow
-    if et_time.hour > 16 or (et_time.hour == 16 and et_time.minute >= 15):
-        et_time += timedelta(days=1)
-    
-    # Add the DTE to get target expiry
-    expiry_date = et_time + timedelta(days=dte)
+# Own handler, so records print bare instead of in RiskMonitor's basicConfig format
+logger = get_queue_logger("option_finder")
+
+@lru_cache(maxsize=64)
+def _expiry_from_base_date(base_date: date, dte: int) -> str:
+    """Expiry string for dte days after base_date, rolled forward off weekends"""
+    expiry_date = base_date + timedelta(days=dte)
     
     # Skip to next weekday if it lands on weekend
     while expiry_date.weekday() > 4:  # 5 = Saturday, 6 = Sunday
@@ -23,175 +21,159 @@ def get_expiry_from_dte(dte: int) -> str:
         
     return expiry_date.strftime('%Y%m%d')
 
-def is_market_hours() -> bool:
-    """Check if current time is during market hours (9:30 AM - 4:15 PM ET)"""
-    et_timezone = pytz.timezone('US/Eastern')
-    current_time = datetime.now(et_timezone).time()
+# Expiries roll to the next base date at 4:15 PM ET
+EXPIRY_ROLLOVER = datetime_time(16, 15)
+
+# dte -> (expiry, epoch seconds the entry stays valid until) for "now" lookups
+_EXPIRY_CACHE = {}
+
+def get_expiry_from_dte(dte: int, as_of: Optional[datetime] = None) -> str:
+    """Calculate the expiry date string from DTE (Days To Expiry), counted from as_of (default now)"""
+    if as_of is None:
+        cached = _EXPIRY_CACHE.get(dte)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+    
+    et_time = as_of.astimezone(ET_TIMEZONE) if as_of else datetime.now(ET_TIMEZONE)
+    base_date = et_time.date()
     
-    market_open = time(9, 30)  # 9:30 AM ET
-    market_close = time(16, 15)  # 4:15 PM ET
+    # If after 4:15 PM ET, start counting from tomorrow
+    if et_time.time() >= EXPIRY_ROLLOVER:
+        base_date += timedelta(days=1)
+    
+    # The answer only changes when base_date does, so memoize on it
+    expiry = _expiry_from_base_date(base_date, dte)
+    if as_of is None:
+        # base_date next changes at its own 4:15 PM rollover
+        valid_until = datetime.combine(base_date, EXPIRY_ROLLOVER, ET_TIMEZONE).timestamp()
+        _EXPIRY_CACHE[dte] = (expiry, valid_until)
+    return expiry
+
+# Strikes fetched either side of the initial strike
+SEARCH_STRIKES = 10
+STRIKE_INCREMENT = 5  # Fallback when the chain doesn't reveal its strike spacing
+PREMIUM_TOLERANCE = 0.02  # Close enough to the target premium to stop searching
+
+def _round_nickel(bid: float, ask: float) -> float:
+    """Bid/ask mid rounded half-up to the nearest 0.05"""
+    # (bid + ask) / 2 * 20 == (bid + ask) * 10; prices are never negative,
+    # so int(x + 0.5) rounds half-up without round()'s banker's rounding
+    return int((bid + ask) * 10 + 0.5) / 20
+
+def _collect_mids(tws, options: list, timeout: float = 2.0) -> dict:
+    """Subscribe bid/ask for all options at once; returns {index: mid} for those quoted"""
+    req_ids = {}
+    for i, option in enumerate(options):
+        req_id = tws.get_next_req_id()
+        req_ids[req_id] = i
+        tws.reqMktData(req_id, option.contract, "100,101", False, False, [])  # Request bid/ask
+    
+    # Drain the shared queue until every subscription has both sides
+    quotes = {req_id: [None, None] for req_id in req_ids}  # [bid, ask]
+    pending = len(quotes)
+    deadline = time.time() + timeout
+    while pending:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        try:
+            # put() wakes this straight away, so block for the full remaining time
+            msg = tws.data_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if msg[0] == 'price' and msg[1] in quotes and msg[2] in (1, 2):  # Bid / Ask
+            quote = quotes[msg[1]]
+            was_complete = None not in quote
+            quote[msg[2] - 1] = msg[3]
+            if not was_complete and None not in quote:
+                pending -= 1
+    
+    for req_id in req_ids:
+        tws.cancelMktData(req_id)
     
-    # Check if current time is between market open and close
-    return market_open <= current_time <= market_close
+    return {
+        req_ids[req_id]: _round_nickel(bid, ask)
+        for req_id, (bid, ask) in quotes.items()
+        if bid is not None and ask is not None
+    }
+
+def _strike_increment(options: list) -> float:
+    """Smallest gap between the listed strikes, or STRIKE_INCREMENT if there's only one"""
+    strikes = sorted({option.contract.strike for option in options})
+    gaps = [b - a for a, b in zip(strikes, strikes[1:])]
+    return min(gaps) if gaps else STRIKE_INCREMENT
+
+def _quote_window(tws, expiry: str, right: str, center_strike: float) -> tuple:
+    """Chain and {index: mid} quotes for the strikes within SEARCH_STRIKES of center_strike"""
+    low_strike = center_strike - SEARCH_STRIKES * STRIKE_INCREMENT
+    high_strike = center_strike + SEARCH_STRIKES * STRIKE_INCREMENT
+    logger.debug("Quoting SPX %s %s-%s %s", right, low_strike, high_strike, expiry)
+    
+    # tws is assumed to be a connector exposing request_option_chain(expiry, right,
+    # strike, strike), reqMktData/cancelMktData, data_queue and get_next_req_id;
+    # IBWrapper doesn't implement these. Contracts are looked up one strike at a
+    # time as before, but the quotes are then collected in a single batch
+    options = []
+    for step in range(-SEARCH_STRIKES, SEARCH_STRIKES + 1):
+        strike = center_strike + step * STRIKE_INCREMENT
+        options.extend(tws.request_option_chain(expiry, right, strike, strike) or [])
+    if not options:
+        logger.error("Failed to get option chain for SPX %s %s-%s %s", right, low_strike, high_strike, expiry)
+        return [], {}
+    
+    mids = _collect_mids(tws, options)
+    if not mids:
+        logger.error("Failed to get bid/ask data")
+    return options, mids
 
 def find_target_delta_option(tws, expiry: str, right: str, price: float, target_delta: float = None) -> Optional[OptionPosition]:
     """Find an option contract with target delta"""
-    print(f"\nLooking for {right} option with target delta/premium: {target_delta}")
-    
     # Round price to nearest 5
     initial_strike = round(price / 5) * 5
     
-    print("Initial parameters:")
-    print(f"Expiry: {expiry}")
-    print(f"Right: {right}")
-    print(f"Initial Strike: {initial_strike}")
-    print(f"Target Delta: {target_delta}")
+    # Search details are debug-only; formatting is deferred until enabled
+    logger.debug("Looking for %s option: expiry=%s initial_strike=%s target=%s",
+                 right, expiry, initial_strike, target_delta)
     
-    if target_delta:
-        print("Searching by delta")
-    else:
-        print("Using exact strike")
-
-    print(f"\nRequesting option chain for:")
-    print(f"SPX {right} {initial_strike} {expiry}")
-    
-    # Request option chain
-    chain = tws.request_option_chain("SPX", expiry, right, initial_strike)
+    if not target_delta:
+        logger.debug("Using exact strike")
+        options = tws.request_option_chain(expiry, right, initial_strike, initial_strike)
+        if not options:
+            logger.error("Failed to get option chain for SPX %s %s %s", right, initial_strike, expiry)
+            return None
+        return options[0]
     
-    if not chain:
-        print("Failed to get option chain")
+    # Fetch every candidate strike in the window and quote them all together,
+    # then search in memory instead of quoting strike by strike
+    options, mids = _quote_window(tws, expiry, right, initial_strike)
+    if not mids:
         return None
-        
-    # Get initial option's delta or premium
-    if target_delta:
-        # Request bid/ask for accurate pricing
-        req_id = tws.get_next_req_id()
-        tws.reqMktData(req_id, chain[0].contract, "100,101", False, False, [])  # Request bid/ask
-        
-        # Wait for bid/ask data
-        bid = ask = None
-        timeout = time.time() + 2
-        while time.time() < timeout and (bid is None or ask is None):
-            try:
-                msg = tws.data_queue.get(timeout=0.1)
-                if msg[0] == 'price' and msg[1] == req_id:
-                    if msg[2] == 1:  # Bid
-                        bid = msg[3]
-                    elif msg[2] == 2:  # Ask
-                        ask = msg[3]
-            except queue.Empty:
-                continue
-        
-        tws.cancelMktData(req_id)
-        
-        if bid is not None and ask is not None:
-            current_value = round(((bid + ask) / 2) * 20) / 20  # Round to nearest 0.05
-            print(f"Initial {right} option price: {current_value:.2f} (bid: {bid:.2f}, ask: {ask:.2f})")
-        else:
-            print("Failed to get bid/ask data")
-            return None
-    else:
-        current_value = chain[0].delta if chain[0].delta is not None else 0
-        print(f"Initial {right} option delta: {current_value:.3f}")
-    
-    # Initialize search variables
-    best_option = chain[0]
-    best_diff = abs(current_value - target_delta)
-    
-    # Determine search direction
-    if target_delta:
-        # For premium: higher strike = lower premium
-        search_up = current_value > target_delta
-    else:
-        # For delta: 
-        # For puts: if delta is too low, move UP to get higher delta
-        # For calls: if delta is too high, move UP to get lower delta
-        search_up = (right == "P" and current_value < target_delta) or (right == "C" and current_value > target_delta)
-    
-    print(f"\nSearch direction: {'UP' if search_up else 'DOWN'} from strike {best_option.contract.strike}")
-    print(f"Current {('premium' if target_delta else 'delta'):<8}: {current_value:.3f}, Target: {target_delta:.3f}")
-    print(f"Moving strike {'up' if search_up else 'down'} in 5-point increments")
-    
-    max_attempts = 20  # Prevent infinite loops
-    attempts = 0
-    
-    while attempts < max_attempts:
-        attempts += 1
-        
-        # Calculate next strike
-        next_strike = best_option.contract.strike + (5 if search_up else -5)
-        print(f"\nAttempt {attempts}/{max_attempts}:")
-        print(f"Checking strike: {next_strike}")
-        
-        # Get option chain for next strike
-        options = tws.request_option_chain(expiry, right, next_strike, next_strike)
-        if not options:
-            print(f"No options found at strike {next_strike}")
-            break
-            
-        # Get new option's delta or premium
-        if target_delta:
-            current_value = tws.get_option_price(options[0].contract)
-            print(f"Strike {next_strike}: premium = {current_value:.2f} (target: {target_delta:.2f})")
-        else:
-            current_value = options[0].delta if options[0].delta is not None else 0
-            print(f"Strike {next_strike}: delta = {current_value:.3f} (target: {target_delta:.3f})")
-            
-        # Check if this option is better
-        current_diff = abs(current_value - target_delta)
-        previous_diff = abs(best_option.delta - target_delta) if not target_delta else abs(best_option.market_price - target_delta)
-        print(f"Current difference: {current_diff:.3f}, Previous best: {previous_diff:.3f}")
-        
-        if current_diff < previous_diff:
-            print(f"Found better option - updating best")
-            best_diff = current_diff
-            best_option = options[0]
-            
-            # If we're very close to target, stop searching
-            if current_diff < 0.02:  # Within 0.02 of target
-                print(f"Within 0.02 of target - stopping search")
-                break
-        elif current_diff > previous_diff * 1.5:  # If getting significantly worse
-            print(f"Getting significantly worse - stopping search")
-            break
-            
-        # Update search direction based on new value
-        if not target_delta:
-            # For puts: if delta is still too low, keep moving UP
-            # For calls: if delta is still too high, keep moving UP
-            search_up = (right == "P" and current_value < target_delta) or (right == "C" and current_value > target_delta)
-    
-    if best_option:
-        if target_delta:
-            # Get final bid/ask for display
-            req_id = tws.get_next_req_id()
-            tws.reqMktData(req_id, best_option.contract, "100,101", False, False, [])
-            
-            bid = ask = None
-            timeout = time.time() + 2
-            while time.time() < timeout and (bid is None or ask is None):
-                try:
-                    msg = tws.data_queue.get(timeout=0.1)
-                    if msg[0] == 'price' and msg[1] == req_id:
-                        if msg[2] == 1:  # Bid
-                            bid = msg[3]
-                        elif msg[2] == 2:  # Ask
-                            ask = msg[3]
-                except queue.Empty:
-                    continue
-            
-            tws.cancelMktData(req_id)
-            
-            if bid is not None and ask is not None:
-                best_option.market_price = round(((bid + ask) / 2) * 20) / 20  # Round to nearest 0.05
-                print(f"\nBest option found:")
-                print(f"Strike: {best_option.contract.strike}")
-                print(f"Premium: {best_option.market_price:.2f} (bid: {bid:.2f}, ask: {ask:.2f})")
-            else:
-                print("\nWarning: Could not get final bid/ask prices")
-        else:
-            print(f"\nBest option found:")
-            print(f"Strike: {best_option.contract.strike}")
-            print(f"Delta: {best_option.delta:.3f}")
-    
-    return best_option
\ No newline at end of file
+    best_index = min(mids, key=lambda i: abs(mids[i] - target_delta))
+    best_option, best_mid = options[best_index], mids[best_index]
+    
+    # If the closest quote sits on the window edge and still misses, the target
+    # lies beyond it. Premium is close to linear in strike there, so take one
+    # Newton step from the two outermost quotes and quote a window around it
+    by_strike = sorted(mids, key=lambda i: options[i].contract.strike)
+    at_edge = best_index in (by_strike[0], by_strike[-1])
+    if at_edge and len(by_strike) > 1 and abs(best_mid - target_delta) > PREMIUM_TOLERANCE:
+        i0, i1 = by_strike[:2] if best_index == by_strike[0] else by_strike[-2:]
+        slope = (mids[i1] - mids[i0]) / (options[i1].contract.strike - options[i0].contract.strike)
+        if slope:
+            step = (target_delta - best_mid) / slope
+            # Snap onto the expiry's own strike grid rather than assuming 5 points
+            increment = _strike_increment(options)
+            next_strike = round((best_option.contract.strike + step) / increment) * increment
+            logger.debug("Target beyond window; stepping to strike %s", next_strike)
+            options2, mids2 = _quote_window(tws, expiry, right, next_strike)
+            if mids2:
+                index2 = min(mids2, key=lambda i: abs(mids2[i] - target_delta))
+                if abs(mids2[index2] - target_delta) < abs(best_mid - target_delta):
+                    best_option, best_mid = options2[index2], mids2[index2]
+    
+    best_option.market_price = best_mid
+    
+    logger.info("Best option found: %s %s premium %.2f (target: %.2f)",
+                right, best_option.contract.strike, best_option.market_price, target_delta)
+    
+    return best_option
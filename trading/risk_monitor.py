@@ -36,21 +36,23 @@ class RiskMonitor:
     
     def _notify_risk_event(self, event: str, details: Dict):
         """Notify all callbacks of risk event"""
-        logging.warning(f"Risk Event: {event} - {details}")
+        logging.warning("Risk Event: %s - %s", event, details)
         for callback in self.risk_callbacks:
             try:
                 callback(event, details)
             except Exception as e:
-                logging.error(f"Error in risk callback: {e}")
+                logging.error("Error in risk callback: %s", e)
     
     def check_position_risk(self, position) -> RiskStatus:
         """Check all risk metrics for a position"""
         breached = []
         
         # Calculate current metrics
-        abs_delta = abs(position.delta) if position.delta else 0
-        unrealized_pnl = position.unrealized_pnl if hasattr(position, 'unrealized_pnl') else 0
-        max_profit = position.max_profit if hasattr(position, 'max_profit') else 0
+        # Account positions (OptionPosition) carry no greeks
+        delta = getattr(position, 'delta', None)
+        abs_delta = abs(delta) if delta else 0
+        unrealized_pnl = getattr(position, 'unrealized_pnl', 0)
+        max_profit = getattr(position, 'max_profit', 0)
         
         # Check delta risk
         if abs_delta > self.thresholds.max_abs_delta:
@@ -87,3 +89,22 @@ class RiskMonitor:
     def should_exit_position(self, status: RiskStatus) -> bool:
         """Determine if position should be exited based on risk"""
         return len(status.breached_thresholds) > 0
+
+    def check_portfolio_risk(self, positions: List) -> List[int]:
+        """Indices of positions breaching any threshold, without per-breach notifications"""
+        # Thresholds are read once for the whole pass rather than per position
+        max_abs_delta = self.thresholds.max_abs_delta
+        max_contracts = self.thresholds.max_contracts
+        max_loss_pct = self.thresholds.max_loss_pct
+        
+        breached = []
+        for i, position in enumerate(positions):
+            delta = getattr(position, 'delta', None) or 0
+            unrealized_pnl = getattr(position, 'unrealized_pnl', 0)
+            max_profit = getattr(position, 'max_profit', 0)
+            if (abs(delta) > max_abs_delta or
+                    abs(position.position) > max_contracts or
+                    (unrealized_pnl and max_profit and
+                     abs(unrealized_pnl) / max_profit > max_loss_pct)):
+                breached.append(i)
+        return breached
@@ -1,7 +1,6 @@
 import schedule
 import time
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta
 from typing import Callable, Dict, Any
 import logging
 from config.trade_config import (
@@ -12,11 +11,42 @@ from config.trade_config import (
 )
 from threading import Thread, Event
 import traceback
+from utils.date_utils import ET_TIMEZONE
+
+# Every config the scheduler registers, built once at import
+CONFIGS = (DC_CONFIG, DC_CONFIG_2, DC_CONFIG_3,
+           DC_CONFIG_4, DC_CONFIG_5, DC_CONFIG_6, IC_CONFIG)
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Entry days as ET weekday() ints per trade name, converted once at import
+_ENTRY_WEEKDAYS = {
+    config.trade_name: frozenset(WEEKDAYS.index(day) for day in config.entry_days)
+    for config in CONFIGS
+}
+
+# How often the TWS connection is checked, as its own scheduled job
+CONNECTION_CHECK_SECONDS = 30
+# Longest the loop sleeps if no job is due
+MAX_IDLE_SECONDS = 60
+
+def _local_entry(day: str, entry_time: str) -> tuple:
+    """(schedule weekday attribute, "HH:MM") in host local time for the next ET entry"""
+    # schedule's .at() runs on the host clock, so convert the next Eastern
+    # occurrence; it's dated, so DST on either side is already applied
+    now = datetime.now(ET_TIMEZONE)
+    hour, minute = map(int, entry_time.split(":"))
+    entry = (now + timedelta(days=(WEEKDAYS.index(day) - now.weekday()) % 7)).replace(
+        hour=hour, minute=minute, second=0, microsecond=0)
+    if entry <= now:
+        entry += timedelta(days=7)
+    local = entry.astimezone()
+    return WEEKDAYS[local.weekday()].lower(), local.strftime("%H:%M")
 
 class TradeScheduler:
     def __init__(self, executor):
         print("Initializing TradeScheduler...")
-        self.et_timezone = pytz.timezone('US/Eastern')
+        self.et_timezone = ET_TIMEZONE
         self.executor = executor
         self._running = False
         self._stop_event = Event()
@@ -27,21 +57,42 @@ class TradeScheduler:
     def setup_schedules(self):
         """Setup all trade schedules"""
         print("Setting up trade schedules...")
-        for config in [DC_CONFIG, DC_CONFIG_2, DC_CONFIG_3, 
-                      DC_CONFIG_4, DC_CONFIG_5, DC_CONFIG_6, IC_CONFIG]:
-            hour, minute = config.entry_time.split(":")
+        self.register_entries()
+        for config in CONFIGS:
+            print(f"Scheduled {config.trade_name} for {config.entry_time} ET on {config.entry_days}")
+        
+        # Re-derive the local entry times daily, so a DST change on either
+        # the host or Eastern side is picked up before the next entry
+        schedule.every().day.at("00:00").do(self.register_entries).tag("entry_sync")
+        
+        # The connection check is a job too, so idle_seconds() accounts for it
+        schedule.every(CONNECTION_CHECK_SECONDS).seconds.do(
+            self.check_connection
+        ).tag("connection_check")
+
+    def register_entries(self):
+        """(Re)register one weekly job per config entry day at its local time"""
+        schedule.clear("entry")
+        for config in CONFIGS:
             for day in config.entry_days:
-                schedule.every().day.at(config.entry_time).do(
+                weekday, at = _local_entry(day, config.entry_time)
+                getattr(schedule.every(), weekday).at(at).do(
                     self.check_and_execute_trade, config
-                ).tag(config.trade_name)
-            print(f"Scheduled {config.trade_name} for {config.entry_time} on {config.entry_days}")
+                ).tag(config.trade_name, "entry")
+
+    def check_connection(self):
+        """Reconnect to TWS if the connection dropped"""
+        if not self.executor.connection_manager.is_connected():
+            print("TWS connection lost - attempting reconnect")
+            self.executor.connection_manager.connect()
 
     def check_and_execute_trade(self, config: TradeConfig) -> bool:
         """Check conditions and execute trade if met"""
-        now = datetime.now(self.et_timezone)
-        current_day = now.strftime("%A")
+        # Jobs fire on their entry day already; this guards against the host's
+        # weekday differing from Eastern time's
+        weekday = datetime.now(self.et_timezone).weekday()
         
-        if current_day in config.entry_days and config.active:
+        if weekday in _ENTRY_WEEKDAYS[config.trade_name] and config.active:
             print(f"✨ Entry conditions met for {config.trade_name}")
             if config.trade_type == TradeType.DOUBLE_CALENDAR:
                 return self.executor.execute_double_calendar(config)
@@ -79,12 +130,11 @@ class TradeScheduler:
                     print("Stop event set - stopping scheduler")
                     return
                 
-                # Check if TWS is still connected
-                if not self.executor.connection_manager.is_connected():
-                    print("TWS connection lost - attempting reconnect")
-                    self.executor.connection_manager.connect()
-                
-                if self._stop_event.wait(1):
+                # Sleep until the next job (trade entry or connection check) is due
+                idle = schedule.idle_seconds()
+                if idle is None or idle > MAX_IDLE_SECONDS:
+                    idle = MAX_IDLE_SECONDS
+                if self._stop_event.wait(max(idle, 0)):
                     print("Scheduler stop requested during wait")
                     return
                 
@@ -1,6 +1,5 @@
 import sys
 from datetime import datetime
-import pytz
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFrame, QTreeWidget, QTreeWidgetItem,
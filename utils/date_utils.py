@@ -1,4 +1,8 @@
 from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# US equity market time; stdlib zoneinfo is cached per name
+ET_TIMEZONE = ZoneInfo("America/New_York")
 
 def get_next_futures_month() -> str:
     """
@@ -0,0 +1,36 @@
+import logging
+import logging.handlers
+import queue
+import sys
+from threading import Lock
+
+# Loggers from get_queue_logger only enqueue records; the listener thread
+# started by start_log_listener does the actual (blocking) stdout writes
+_log_queue = queue.Queue(-1)
+_listener = None
+_listener_lock = Lock()
+
+def get_queue_logger(name: str) -> logging.Logger:
+    """Logger whose records go through the shared queue"""
+    logger = logging.getLogger(name)
+    if not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers):
+        logger.setLevel(logging.INFO)
+        logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+        logger.propagate = False
+    return logger
+
+def start_log_listener():
+    """Start writing queued records to stdout (no-op if already running)"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+            _listener.start()
+
+def stop_log_listener():
+    """Write out any queued records and stop the listener thread"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
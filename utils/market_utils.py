@@ -1,6 +1,8 @@
 from datetime import datetime, time
-import pytz
+from functools import lru_cache
 from typing import Tuple
+import time as _time
+from utils.date_utils import ET_TIMEZONE
 
 def get_market_schedule() -> Tuple[time, time]:
     """Get market open and close times"""
@@ -10,8 +12,14 @@ def get_market_schedule() -> Tuple[time, time]:
 
 def is_market_hours() -> bool:
     """Check if current time is during extended market hours"""
-    et_timezone = pytz.timezone('US/Eastern')
-    current_time = datetime.now(et_timezone)
+    # Callers check this on every loop pass; the answer only changes once a
+    # second at most, so reuse it within the same second
+    return _is_market_hours_at(int(_time.time()))
+
+@lru_cache(maxsize=1)
+def _is_market_hours_at(epoch_second: int) -> bool:
+    """is_market_hours for a given epoch second"""
+    current_time = datetime.fromtimestamp(epoch_second, ET_TIMEZONE)
     
     market_open, market_close = get_market_schedule()
     current_time_only = current_time.time()
@@ -27,8 +35,7 @@ def is_market_hours() -> bool:
 
 def is_trading_day() -> bool:
     """Check if today is a trading day"""
-    et_timezone = pytz.timezone('US/Eastern')
-    current_time = datetime.now(et_timezone)
+    current_time = datetime.now(ET_TIMEZONE)
     
     # Check if it's a weekday (Monday = 0, Sunday = 6)
     if current_time.weekday() in [5, 6]:  # Saturday or Sunday
@@ -39,7 +46,7 @@ def is_trading_day() -> bool:
 
 def get_market_status() -> dict:
     """Get detailed market status information"""
-    now = datetime.now(pytz.timezone('US/Eastern'))
+    now = datetime.now(ET_TIMEZONE)
     
     market_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
     market_close = now.replace(hour=16, minute=0, second=0, microsecond=0)